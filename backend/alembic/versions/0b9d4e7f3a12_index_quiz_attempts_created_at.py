@@ -0,0 +1,28 @@
+"""Index quiz attempts by creation time
+
+Revision ID: 0b9d4e7f3a12
+Revises: f1c6a8d3b947
+Create Date: 2026-10-19 17:46:20.661384
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b9d4e7f3a12'
+down_revision: Union[str, Sequence[str], None] = 'f1c6a8d3b947'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_quiz_attempts_created_at'), 'quiz_attempts', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_quiz_attempts_created_at'), table_name='quiz_attempts')
@@ -0,0 +1,70 @@
+"""Add document versions and pages
+
+Revision ID: 5f0b8e2d9c61
+Revises: e4a9c2f17b36
+Create Date: 2026-10-19 13:48:19.337402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '5f0b8e2d9c61'
+down_revision: Union[str, Sequence[str], None] = 'e4a9c2f17b36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('current_version', sa.Integer(), server_default='1', nullable=False))
+
+    op.create_table('document_versions',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('document_id', sa.UUID(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('filename', sa.String(length=255), nullable=False),
+    sa.Column('file_path', sa.String(length=500), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('page_count', sa.Integer(), nullable=True),
+    sa.Column('changed_pages', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('document_id', 'version', name='uq_document_versions_document_id_version')
+    )
+    op.create_table('page_contents',
+    sa.Column('document_id', sa.UUID(), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('document_id', 'content_hash')
+    )
+    op.create_table('document_pages',
+    sa.Column('document_id', sa.UUID(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('page_number', sa.Integer(), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['document_id', 'content_hash'], ['page_contents.document_id', 'page_contents.content_hash'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('document_id', 'version', 'page_number')
+    )
+
+    # Every existing document becomes version 1 of itself
+    op.execute("""
+        INSERT INTO document_versions (id, document_id, version, filename, file_path, size, created_at)
+        SELECT gen_random_uuid(), id, 1, filename, file_path, size, created_at
+        FROM documents
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('document_pages')
+    op.drop_table('page_contents')
+    op.drop_table('document_versions')
+    op.drop_column('documents', 'current_version')
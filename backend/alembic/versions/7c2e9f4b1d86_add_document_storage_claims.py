@@ -0,0 +1,30 @@
+"""Add storage claims for background compression
+
+Revision ID: 7c2e9f4b1d86
+Revises: 0b9d4e7f3a12
+Create Date: 2026-10-19 18:32:47.205918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e9f4b1d86'
+down_revision: Union[str, Sequence[str], None] = '0b9d4e7f3a12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('storage_claimed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Documents claimed at downgrade time are simply hot again
+    op.execute("UPDATE documents SET storage_tier = 'hot' WHERE storage_tier = 'compressing'")
+    op.drop_column('documents', 'storage_claimed_at')
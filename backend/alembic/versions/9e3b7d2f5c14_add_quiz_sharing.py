@@ -0,0 +1,28 @@
+"""Add sharing of quizzes within a department
+
+Revision ID: 9e3b7d2f5c14
+Revises: 7c2e9f4b1d86
+Create Date: 2026-10-19 21:04:12.583107
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e3b7d2f5c14'
+down_revision: Union[str, Sequence[str], None] = '7c2e9f4b1d86'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('quizzes', sa.Column('shared', sa.Boolean(), server_default='false', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('quizzes', 'shared')
@@ -0,0 +1,112 @@
+"""Add quizzes, attempts and review scheduling
+
+Revision ID: a27d6f3e8b15
+Revises: 5f0b8e2d9c61
+Create Date: 2026-10-19 15:02:11.873590
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'a27d6f3e8b15'
+down_revision: Union[str, Sequence[str], None] = '5f0b8e2d9c61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('quizzes',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('document_id', sa.UUID(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('difficulty', sa.String(length=20), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_quizzes_user_id'), 'quizzes', ['user_id'], unique=False)
+    op.create_index(op.f('ix_quizzes_document_id'), 'quizzes', ['document_id'], unique=False)
+
+    op.create_table('quiz_questions',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('quiz_id', sa.UUID(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.Column('type', sa.String(length=20), nullable=False),
+    sa.Column('options', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('correct_index', sa.Integer(), nullable=False),
+    sa.Column('explanation', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['quiz_id'], ['quizzes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_quiz_questions_quiz_id'), 'quiz_questions', ['quiz_id'], unique=False)
+
+    op.create_table('quiz_attempts',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('quiz_id', sa.UUID(), nullable=True),
+    sa.Column('correct_count', sa.Integer(), nullable=False),
+    sa.Column('total_count', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['quiz_id'], ['quizzes.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_quiz_attempts_user_id'), 'quiz_attempts', ['user_id'], unique=False)
+    op.create_index(op.f('ix_quiz_attempts_quiz_id'), 'quiz_attempts', ['quiz_id'], unique=False)
+
+    op.create_table('quiz_answers',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('attempt_id', sa.UUID(), nullable=False),
+    sa.Column('question_id', sa.BigInteger(), nullable=False),
+    sa.Column('selected_index', sa.Integer(), nullable=False),
+    sa.Column('is_correct', sa.Boolean(), nullable=False),
+    sa.Column('quality', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['attempt_id'], ['quiz_attempts.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['question_id'], ['quiz_questions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_quiz_answers_attempt_id'), 'quiz_answers', ['attempt_id'], unique=False)
+    op.create_index(op.f('ix_quiz_answers_question_id'), 'quiz_answers', ['question_id'], unique=False)
+
+    op.create_table('review_states',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('question_id', sa.BigInteger(), nullable=False),
+    sa.Column('repetitions', sa.Integer(), nullable=False),
+    sa.Column('interval_days', sa.Integer(), nullable=False),
+    sa.Column('easiness', sa.Float(), nullable=False),
+    sa.Column('due_at', sa.DateTime(), nullable=False),
+    sa.Column('last_reviewed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['question_id'], ['quiz_questions.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'question_id')
+    )
+    op.create_index('ix_review_states_user_id_due_at', 'review_states', ['user_id', 'due_at'], unique=False)
+    op.create_index('ix_review_states_question_id', 'review_states', ['question_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_review_states_question_id', table_name='review_states')
+    op.drop_index('ix_review_states_user_id_due_at', table_name='review_states')
+    op.drop_table('review_states')
+    op.drop_index(op.f('ix_quiz_answers_question_id'), table_name='quiz_answers')
+    op.drop_index(op.f('ix_quiz_answers_attempt_id'), table_name='quiz_answers')
+    op.drop_table('quiz_answers')
+    op.drop_index(op.f('ix_quiz_attempts_quiz_id'), table_name='quiz_attempts')
+    op.drop_index(op.f('ix_quiz_attempts_user_id'), table_name='quiz_attempts')
+    op.drop_table('quiz_attempts')
+    op.drop_index(op.f('ix_quiz_questions_quiz_id'), table_name='quiz_questions')
+    op.drop_table('quiz_questions')
+    op.drop_index(op.f('ix_quizzes_document_id'), table_name='quizzes')
+    op.drop_index(op.f('ix_quizzes_user_id'), table_name='quizzes')
+    op.drop_table('quizzes')
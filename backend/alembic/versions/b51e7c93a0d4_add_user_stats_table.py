@@ -0,0 +1,54 @@
+"""Add user stats table
+
+Revision ID: b51e7c93a0d4
+Revises: 8d2f4a6c1e73
+Create Date: 2026-10-19 11:21:07.550213
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b51e7c93a0d4'
+down_revision: Union[str, Sequence[str], None] = '8d2f4a6c1e73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_stats',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('documents_total', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('documents_processing', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('documents_analyzed', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('documents_error', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('total_bytes', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('quizzes_taken', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('quiz_score_sum', sa.Float(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    # Fill the counters for documents that already exist
+    op.execute("""
+        INSERT INTO user_stats (user_id, documents_total, documents_processing,
+                                documents_analyzed, documents_error, total_bytes, updated_at)
+        SELECT user_id,
+               COUNT(*),
+               COUNT(*) FILTER (WHERE status = 'Processing'),
+               COUNT(*) FILTER (WHERE status = 'Analyzed'),
+               COUNT(*) FILTER (WHERE status = 'Error'),
+               COALESCE(SUM(size), 0),
+               now()
+        FROM documents
+        GROUP BY user_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_stats')
@@ -0,0 +1,49 @@
+"""Add chapters and chapter quizzes
+
+Revision ID: c83f5a1d7e29
+Revises: a27d6f3e8b15
+Create Date: 2026-10-19 15:48:36.204117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c83f5a1d7e29'
+down_revision: Union[str, Sequence[str], None] = 'a27d6f3e8b15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('chapters',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('document_id', sa.UUID(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('level', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('start_page', sa.Integer(), nullable=False),
+    sa.Column('end_page', sa.Integer(), nullable=False),
+    sa.Column('source', sa.String(length=20), nullable=False),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_chapters_document_id_version_position', 'chapters', ['document_id', 'version', 'position'], unique=False)
+
+    op.add_column('quizzes', sa.Column('chapter_id', sa.UUID(), nullable=True))
+    op.create_index(op.f('ix_quizzes_chapter_id'), 'quizzes', ['chapter_id'], unique=False)
+    op.create_foreign_key('quizzes_chapter_id_fkey', 'quizzes', 'chapters', ['chapter_id'], ['id'], ondelete='SET NULL')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('quizzes_chapter_id_fkey', 'quizzes', type_='foreignkey')
+    op.drop_index(op.f('ix_quizzes_chapter_id'), table_name='quizzes')
+    op.drop_column('quizzes', 'chapter_id')
+    op.drop_index('ix_chapters_document_id_version_position', table_name='chapters')
+    op.drop_table('chapters')
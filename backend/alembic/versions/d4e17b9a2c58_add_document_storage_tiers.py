@@ -0,0 +1,36 @@
+"""Add document storage tiers
+
+Revision ID: d4e17b9a2c58
+Revises: c83f5a1d7e29
+Create Date: 2026-10-19 16:21:09.517342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e17b9a2c58'
+down_revision: Union[str, Sequence[str], None] = 'c83f5a1d7e29'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('storage_tier', sa.String(length=20), server_default='hot', nullable=False))
+    op.add_column('documents', sa.Column('last_accessed_at', sa.DateTime(), nullable=True))
+    # Existing documents count as last opened when they were uploaded
+    op.execute("UPDATE documents SET last_accessed_at = created_at")
+    op.create_index('ix_documents_storage_tier_last_accessed_at', 'documents', ['storage_tier', 'last_accessed_at'], unique=False)
+    op.create_index(op.f('ix_documents_file_path'), 'documents', ['file_path'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_documents_file_path'), table_name='documents')
+    op.drop_index('ix_documents_storage_tier_last_accessed_at', table_name='documents')
+    op.drop_column('documents', 'last_accessed_at')
+    op.drop_column('documents', 'storage_tier')
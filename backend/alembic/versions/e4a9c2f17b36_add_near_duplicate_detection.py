@@ -0,0 +1,55 @@
+"""Add near-duplicate detection
+
+Revision ID: e4a9c2f17b36
+Revises: b51e7c93a0d4
+Create Date: 2026-10-19 12:37:44.106925
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a9c2f17b36'
+down_revision: Union[str, Sequence[str], None] = 'b51e7c93a0d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('duplicate_of_id', sa.UUID(), nullable=True))
+    op.add_column('documents', sa.Column('duplicate_similarity', sa.Float(), nullable=True))
+    op.create_foreign_key('documents_duplicate_of_id_fkey', 'documents', 'documents', ['duplicate_of_id'], ['id'], ondelete='SET NULL')
+    op.create_index(op.f('ix_documents_duplicate_of_id'), 'documents', ['duplicate_of_id'], unique=False)
+
+    op.create_table('document_signatures',
+    sa.Column('document_id', sa.UUID(), nullable=False),
+    sa.Column('signature', sa.LargeBinary(), nullable=False),
+    sa.Column('shingle_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('document_id')
+    )
+    op.create_table('lsh_buckets',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('band', sa.Integer(), nullable=False),
+    sa.Column('bucket_hash', sa.BigInteger(), nullable=False),
+    sa.Column('document_id', sa.UUID(), nullable=False),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'band', 'bucket_hash', 'document_id')
+    )
+    op.create_index('ix_lsh_buckets_document_id', 'lsh_buckets', ['document_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_lsh_buckets_document_id', table_name='lsh_buckets')
+    op.drop_table('lsh_buckets')
+    op.drop_table('document_signatures')
+    op.drop_index(op.f('ix_documents_duplicate_of_id'), table_name='documents')
+    op.drop_constraint('documents_duplicate_of_id_fkey', 'documents', type_='foreignkey')
+    op.drop_column('documents', 'duplicate_similarity')
+    op.drop_column('documents', 'duplicate_of_id')
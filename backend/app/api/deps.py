@@ -1,20 +1,27 @@
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from jose import jwt, JWTError
+from jose import JWTError
 
+from app.core import security
 from app.core.config import settings
 from app.core.database import get_db
-from app import models
+from app.core.revocation import revocations
+from app import schemas
 
 # This helps FastAPI understand how to get the token from the request header
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
+# Same, but a missing token is not an error
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login", auto_error=False)
 
-# This function will be used by our routes to get the user who is currently logged in
+# This function will be used by our routes to get the user who is currently logged in.
+# The token carries everything routes need, so a valid token costs no query unless
+# the in-memory revocation filter thinks it may have been revoked.
 def get_current_user(
     db: Session = Depends(get_db),
     token: str = Depends(oauth2_scheme)
-) -> models.User:
+) -> schemas.TokenUser:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -22,15 +29,30 @@ def get_current_user(
     )
     try:
         # Decode the token to get the user's ID
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-        
-    # Find the user in the database using the ID from the token
-    user = db.query(models.User).filter(models.User.id == user_id).first()
-    if user is None:
+        payload = security.decode_token(token, security.TOKEN_TYPE_ACCESS)
+        user = schemas.TokenUser(
+            id=payload["sub"],
+            role=payload.get("role") or "employee",
+            department=payload.get("department"),
+            jti=payload["jti"],
+            expires_at=payload["exp"],
+        )
+    except (JWTError, ValueError):
         raise credentials_exception
+
+    if revocations.might_be_revoked(user.jti, str(user.id)):
+        if revocations.is_revoked(db, user.jti, str(user.id), security.issued_at(payload)):
+            raise credentials_exception
     return user
+
+# For routes that also work without a (valid) access token, e.g. logout after it expired
+def get_optional_user(
+    db: Session = Depends(get_db),
+    token: Optional[str] = Depends(optional_oauth2_scheme)
+) -> Optional[schemas.TokenUser]:
+    if not token:
+        return None
+    try:
+        return get_current_user(db, token)
+    except HTTPException:
+        return None
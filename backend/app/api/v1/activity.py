@@ -0,0 +1,31 @@
+from typing import Any, List
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.core.activity import recorder
+from app.core.database import get_db
+from app.api.deps import get_current_user
+
+router = APIRouter()
+
+# --- API ENDPOINTS ---
+
+@router.get("/", response_model=List[schemas.ActivityResponse])
+def list_activity(
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: schemas.TokenUser = Depends(get_current_user)
+) -> Any:
+    """
+    Get the most recent activity of the logged-in user for the dashboard feed
+    """
+    # Served by the (user_id, created_at DESC) index
+    stored = db.query(models.Activity).filter(
+        models.Activity.user_id == current_user.id
+    ).order_by(models.Activity.created_at.desc()).limit(limit).all()
+
+    # Events that are still waiting in the write-behind buffer are newer than anything stored
+    pending = [schemas.ActivityResponse(**event) for event in recorder.pending_for(current_user.id)]
+    stored = [schemas.ActivityResponse.model_validate(activity) for activity in stored]
+    return (pending + stored)[:limit]
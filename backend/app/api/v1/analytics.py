@@ -0,0 +1,69 @@
+import uuid
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.core.analytics import analytics_cache
+from app.core.database import get_db
+from app.api.deps import get_current_user
+
+router = APIRouter()
+
+# Roles that may see results of other users. Admins see every department,
+# the others only their own.
+ANALYTICS_ROLES = ("admin", "manager", "teacher")
+
+# --- HELPER FUNCTIONS ---
+
+def get_analytics_user(current_user: schemas.TokenUser = Depends(get_current_user)) -> schemas.TokenUser:
+    if current_user.role not in ANALYTICS_ROLES:
+        raise HTTPException(status_code=403, detail="Not allowed to view analytics")
+    return current_user
+
+# The department a user may look at: any (or all, None) for admins, their own for everybody else
+def allowed_department(user: schemas.TokenUser, department: Optional[str]) -> Optional[str]:
+    if user.role == "admin":
+        return department
+    # None would mean every department
+    if user.department is None:
+        raise HTTPException(status_code=403, detail="No department assigned to view analytics for")
+    if department is not None and department != user.department:
+        raise HTTPException(status_code=403, detail="Not allowed to view other departments")
+    return user.department
+
+# --- API ENDPOINTS ---
+
+@router.get("/quizzes/{quiz_id}", response_model=schemas.QuizAnalyticsResponse)
+def get_quiz_analytics(
+    quiz_id: uuid.UUID,
+    department: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: schemas.TokenUser = Depends(get_analytics_user)
+) -> Any:
+    """
+    Difficulty, discrimination and option frequencies of every question of a quiz
+    """
+    department = allowed_department(current_user, department)
+    quiz = db.query(models.Quiz.id).filter(models.Quiz.id == quiz_id)
+    if current_user.role != "admin":
+        # Only quizzes of users in the caller's department
+        quiz = quiz.join(models.User, models.User.id == models.Quiz.user_id).filter(
+            models.User.department == department
+        )
+    if not quiz.first():
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    return analytics_cache.item_statistics(quiz_id, department)
+
+@router.get("/departments", response_model=List[schemas.DepartmentScoresResponse])
+def get_department_scores(
+    current_user: schemas.TokenUser = Depends(get_analytics_user)
+) -> Any:
+    """
+    Quiz score distribution per department
+    """
+    results = analytics_cache.department_scores()
+    if current_user.role == "admin":
+        return results
+    department = allowed_department(current_user, None)
+    return [result for result in results if result["department"] == department]
@@ -1,10 +1,30 @@
 from fastapi import APIRouter
 
+from app.core.admission import admission, PRIORITY_CRITICAL, PRIORITY_LOW, PRIORITY_NORMAL
+from app.core.config import settings
+
 api_router = APIRouter()
-from . import auth, documents, quizzes, summary
+from . import activity, analytics, auth, documents, export, quizzes, reviews, stats, summary, uploads
 
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(documents.router, prefix="/documents", tags=["documents"])
+api_router.include_router(uploads.router, prefix="/uploads", tags=["uploads"])
 api_router.include_router(quizzes.router, prefix="/quizzes", tags=["quizzes"])
+api_router.include_router(reviews.router, prefix="/reviews", tags=["reviews"])
 api_router.include_router(summary.router, prefix="/summary", tags=["summary"])
+api_router.include_router(activity.router, prefix="/activity", tags=["activity"])
+api_router.include_router(stats.router, prefix="/stats", tags=["stats"])
+api_router.include_router(export.router, prefix="/export", tags=["export"])
+api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
 
+# Load shedding priorities (everything not listed here is "normal").
+# Auth must keep working under load; generation and bulk listing are shed first.
+admission.set_priority(f"{settings.API_V1_STR}/auth", PRIORITY_CRITICAL)
+# Only the document list itself is bulk; reads of one document stay normal
+admission.set_priority(f"{settings.API_V1_STR}/documents", PRIORITY_LOW, methods=["GET"], exact=True)
+admission.set_priority(f"{settings.API_V1_STR}/quizzes/generate", PRIORITY_LOW)
+admission.set_priority(f"{settings.API_V1_STR}/summary", PRIORITY_LOW, methods=["POST"])
+# Exports and upload chunks last as long as the client's connection does
+admission.set_priority(f"{settings.API_V1_STR}/export", PRIORITY_LOW, streaming=True)
+admission.set_priority(f"{settings.API_V1_STR}/uploads", PRIORITY_NORMAL, methods=["PATCH"], streaming=True)
+admission.set_priority(f"{settings.API_V1_STR}/analytics", PRIORITY_LOW)
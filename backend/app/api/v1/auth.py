@@ -1,16 +1,47 @@
-from datetime import timedelta
-from typing import Any
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
+from jose import JWTError
 from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordRequestForm
 
 from app.core import security
+from app.core.activity import recorder
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.revocation import revocations
+from app.api.deps import get_optional_user
 from app import models, schemas
 
 router = APIRouter()
 
+# --- HELPER FUNCTIONS ---
+
+def issue_tokens(db: Session, user: models.User, family_id: Optional[uuid.UUID] = None) -> dict:
+    """
+    A new access token and the next refresh token of the session (a new
+    session if family_id is None). The caller commits.
+    """
+    refresh = models.RefreshToken(
+        id=uuid.uuid4(),
+        user_id=user.id,
+        family_id=family_id or uuid.uuid4(),
+        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+    db.add(refresh)
+    return {
+        # Role and department travel in the token so routes don't have to load the user
+        "access_token": security.create_access_token(
+            user.id, claims={"role": user.role, "department": user.department}
+        ),
+        "refresh_token": security.create_refresh_token(user.id, refresh.id),
+        "token_type": "bearer",
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
+
+# --- API ENDPOINTS ---
+
 @router.post("/register", status_code=201)
 def register_user(
     user_in: schemas.UserCreate,
@@ -60,18 +91,106 @@ def login_access_token(
     
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-        
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+
+    tokens = issue_tokens(db, user)
+    db.commit()
+
+    # last_login and the feed entry are written later in a batch, not on this request
+    recorder.record_login(user.id)
+
     return {
         "status_code": 200,
         "detail": "Login successful",
-        "access_token": security.create_access_token(
-            user.id, expires_delta=access_token_expires
-        ),
-        "token_type": "bearer",
+        **tokens,
         "user": schemas.UserResponse.model_validate(user)
     }
 
+@router.post("/refresh")
+def refresh_access_token(
+    token_in: schemas.TokenRefresh,
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    Trade a refresh token for a new access token and a new refresh token.
+    Each refresh token works once.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        payload = security.decode_token(token_in.refresh_token, security.TOKEN_TYPE_REFRESH)
+        token_id = uuid.UUID(payload["jti"])
+    except (JWTError, ValueError):
+        raise credentials_exception
+
+    # Locked so two refreshes with the same token can't both succeed
+    refresh = db.query(models.RefreshToken).filter(
+        models.RefreshToken.id == token_id
+    ).with_for_update().first()
+    if not refresh or refresh.revoked_at is not None or refresh.expires_at < datetime.utcnow():
+        raise credentials_exception
+
+    now = datetime.utcnow()
+    if refresh.used_at is not None:
+        # Someone is replaying an old token: end the whole session for everyone holding it
+        db.query(models.RefreshToken).filter(
+            models.RefreshToken.family_id == refresh.family_id,
+            models.RefreshToken.revoked_at.is_(None)
+        ).update({"revoked_at": now}, synchronize_session=False)
+        db.commit()
+        raise credentials_exception
+
+    user = db.get(models.User, refresh.user_id)
+    if not user or not user.is_active:
+        raise credentials_exception
+
+    refresh.used_at = now
+    tokens = issue_tokens(db, user, family_id=refresh.family_id)
+    db.commit()
+    return tokens
+
+@router.post("/logout")
+def logout(
+    token_in: schemas.TokenLogout,
+    db: Session = Depends(get_db),
+    current_user: Optional[schemas.TokenUser] = Depends(get_optional_user)
+) -> Any:
+    """
+    Revoke the current access token and, if given, end the refresh token's session.
+    Either token is enough: the access token has often expired by the time
+    somebody logs out, and holding the refresh token proves the session is theirs.
+    """
+    refresh = None
+    if token_in.refresh_token:
+        try:
+            payload = security.decode_token(token_in.refresh_token, security.TOKEN_TYPE_REFRESH)
+            refresh = db.get(models.RefreshToken, uuid.UUID(payload["jti"]))
+        except (JWTError, ValueError):
+            refresh = None
+        if refresh and current_user is not None and refresh.user_id != current_user.id:
+            refresh = None
+
+    if current_user is None and refresh is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    if current_user is not None:
+        revocations.revoke_token(
+            db, current_user.jti, current_user.id, datetime.utcfromtimestamp(current_user.expires_at)
+        )
+    if refresh is not None:
+        db.query(models.RefreshToken).filter(
+            models.RefreshToken.family_id == refresh.family_id,
+            models.RefreshToken.revoked_at.is_(None)
+        ).update({"revoked_at": datetime.utcnow()}, synchronize_session=False)
+    db.commit()
+    return {"message": "Logged out successfully."}
+
 @router.post("/forgot-password")
 def forgot_password(
     email_in: schemas.UserLogin, # reusing schema just for email
@@ -86,7 +205,9 @@ def forgot_password(
         return {"message": "If the email exists, a reset link has been sent."}
     
     # Generate reset token (short lived, e.g., 15 min)
-    reset_token = security.create_access_token(user.email, expires_delta=timedelta(minutes=15))
+    reset_token = security.create_token(
+        user.email, security.TOKEN_TYPE_RESET, timedelta(minutes=settings.PASSWORD_RESET_TOKEN_EXPIRE_MINUTES)
+    )
     
     # TODO: Send email
     print(f"------------ PASSWORD RESET LINK ------------")
@@ -110,13 +231,18 @@ def reset_password(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    email = security.verify_token(token, credentials_exception)
+    payload = security.verify_token(token, credentials_exception)
     
-    user = db.query(models.User).filter(models.User.email == email).first()
+    user = db.query(models.User).filter(models.User.email == payload["sub"]).first()
     if not user:
         raise credentials_exception
+    # A reset token works once: the reset below revokes it along with everything else
+    if user.tokens_valid_after is not None and security.issued_at(payload) < user.tokens_valid_after:
+        raise credentials_exception
     
     user.password_hash = security.get_password_hash(new_password)
+    # Sessions from before the reset (maybe the attacker's) end here
+    revocations.revoke_user(db, user)
     db.add(user)
     db.commit()
     
@@ -1,12 +1,16 @@
 import os
 import shutil
 import uuid
+from datetime import datetime
 from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, status
 from sqlalchemy.orm import Session
 
 from app import models, schemas
+from app.core import stats, storage, versions
+from app.core.activity import recorder
 from app.core.database import get_db
+from app.core.processing import process_document
 from app.api.deps import get_current_user
 
 router = APIRouter()
@@ -25,9 +29,10 @@ def ensure_upload_dir():
 
 @router.post("/upload", response_model=schemas.DocumentResponse)
 def upload_document(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: schemas.TokenUser = Depends(get_current_user)
 ) -> Any:
     """
     Handle file upload and save info to database
@@ -66,15 +71,23 @@ def upload_document(
     )
 
     db.add(new_doc)
+    db.flush()
+    versions.add_version(db, new_doc, file.filename, file_path, file_size)
+    stats.document_added(db, new_doc)
     db.commit()
     db.refresh(new_doc)
 
+    recorder.record(current_user.id, "document", f"Uploaded {new_doc.filename}")
+
+    # Extract text and look for near-duplicates after the response is sent
+    background_tasks.add_task(process_document, new_doc.id)
+
     return new_doc
 
 @router.get("/", response_model=List[schemas.DocumentResponse])
 def list_documents(
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: schemas.TokenUser = Depends(get_current_user)
 ) -> Any:
     """
     Get all documents for the logged-in user
@@ -82,11 +95,175 @@ def list_documents(
     docs = db.query(models.Document).filter(models.Document.user_id == current_user.id).all()
     return docs
 
+@router.get("/duplicates", response_model=List[schemas.DuplicateClusterResponse])
+def list_duplicate_clusters(
+    db: Session = Depends(get_db),
+    current_user: schemas.TokenUser = Depends(get_current_user)
+) -> Any:
+    """
+    Group the user's documents that are near-duplicates of each other
+    """
+    duplicates = db.query(models.Document).filter(
+        models.Document.user_id == current_user.id,
+        models.Document.duplicate_of_id.isnot(None)
+    ).order_by(models.Document.created_at).all()
+    if not duplicates:
+        return []
+
+    originals = db.query(models.Document).filter(
+        models.Document.id.in_({doc.duplicate_of_id for doc in duplicates})
+    ).all()
+
+    clusters = {doc.id: {"original": doc, "duplicates": []} for doc in originals}
+    for doc in duplicates:
+        if doc.duplicate_of_id in clusters:
+            clusters[doc.duplicate_of_id]["duplicates"].append(doc)
+    return list(clusters.values())
+
+@router.post("/{document_id}/versions", response_model=schemas.DocumentVersionResponse)
+def upload_document_version(
+    document_id: uuid.UUID,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: schemas.TokenUser = Depends(get_current_user)
+) -> Any:
+    """
+    Upload an updated edition of an existing document.
+    Only pages that changed are processed again.
+    """
+    document_query = db.query(models.Document).filter(
+        models.Document.id == document_id,
+        models.Document.user_id == current_user.id
+    )
+    doc = document_query.first()
+    if not doc:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    file_extension = os.path.splitext(file.filename)[1]
+    if file_extension.replace(".", "").lower() != doc.file_type.lower():
+        raise HTTPException(status_code=400, detail=f"A new version must be a {doc.file_type} file")
+    # Don't keep a transaction open while the file is copied
+    db.rollback()
+
+    # Copy under a temporary name first (hidden, so it is never served) and
+    # lock the document only to pick the version number and switch to it
+    ensure_upload_dir()
+    temp_path = os.path.join(UPLOAD_DIR, f".{document_id}_{uuid.uuid4().hex}.upload")
+    try:
+        with open(temp_path, "wb") as buffer:
+            shutil.copyfileobj(file.file, buffer)
+    except Exception as e:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise HTTPException(status_code=500, detail=f"Could not save file: {str(e)}")
+
+    doc = document_query.with_for_update().first()
+    if not doc:
+        # Deleted while we were copying
+        os.remove(temp_path)
+        raise HTTPException(status_code=404, detail="Document not found")
+    next_version = doc.current_version + 1
+    file_path = os.path.join(UPLOAD_DIR, f"{doc.id}_v{next_version}{file_extension}")
+    os.replace(temp_path, file_path)
+    file_size = os.path.getsize(file_path)
+
+    # Older versions stay on disk; the document now points at the new file
+    stats.apply_delta(db, doc.user_id, total_bytes=file_size - doc.size)
+    stats.set_document_status(db, doc, "Processing")
+    doc.current_version = next_version
+    doc.file_path = file_path
+    doc.size = file_size
+    # The new file is raw and in use; earlier versions keep their tier
+    doc.storage_tier = "hot"
+    doc.last_accessed_at = datetime.utcnow()
+    version = versions.add_version(db, doc, file.filename, file_path, file_size)
+    db.commit()
+    db.refresh(version)
+
+    recorder.record(current_user.id, "document", f"Uploaded version {next_version} of {doc.filename}")
+    background_tasks.add_task(process_document, doc.id)
+
+    return version
+
+@router.get("/{document_id}/versions", response_model=List[schemas.DocumentVersionResponse])
+def list_document_versions(
+    document_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: schemas.TokenUser = Depends(get_current_user)
+) -> Any:
+    """
+    Get all versions of a document, newest first
+    """
+    doc = db.query(models.Document).filter(
+        models.Document.id == document_id,
+        models.Document.user_id == current_user.id
+    ).first()
+
+    if not doc:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    return db.query(models.DocumentVersion).filter(
+        models.DocumentVersion.document_id == doc.id
+    ).order_by(models.DocumentVersion.version.desc()).all()
+
+@router.get("/{document_id}/chapters", response_model=List[schemas.ChapterResponse])
+def list_document_chapters(
+    document_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: schemas.TokenUser = Depends(get_current_user)
+) -> Any:
+    """
+    Get the detected chapters of the current version, with their quiz state
+    """
+    doc = db.query(models.Document).filter(
+        models.Document.id == document_id,
+        models.Document.user_id == current_user.id
+    ).first()
+
+    if not doc:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    chapters = db.query(models.Chapter).filter(
+        models.Chapter.document_id == doc.id,
+        models.Chapter.version == doc.current_version
+    ).order_by(models.Chapter.position).all()
+
+    # Latest quiz per chapter and the latest attempt of each quiz, two queries in total
+    latest_quiz = {}
+    for quiz in db.query(models.Quiz).filter(
+        models.Quiz.chapter_id.in_([chapter.id for chapter in chapters]),
+        models.Quiz.user_id == current_user.id
+    ).order_by(models.Quiz.created_at):
+        latest_quiz[quiz.chapter_id] = quiz
+    latest_attempt = {}
+    for attempt in db.query(models.QuizAttempt).filter(
+        models.QuizAttempt.quiz_id.in_([quiz.id for quiz in latest_quiz.values()])
+    ).order_by(models.QuizAttempt.created_at):
+        latest_attempt[attempt.quiz_id] = attempt
+
+    result = []
+    for chapter in chapters:
+        quiz = latest_quiz.get(chapter.id)
+        attempt = latest_attempt.get(quiz.id) if quiz else None
+        result.append(schemas.ChapterResponse(
+            id=chapter.id,
+            chapter_number=chapter.position,
+            level=chapter.level,
+            title=chapter.title,
+            start_page=chapter.start_page,
+            end_page=chapter.end_page,
+            quiz_id=quiz.id if quiz else None,
+            quiz_status="completed" if attempt else ("ready" if quiz else "not_started"),
+            score={"correct": attempt.correct_count, "total": attempt.total_count} if attempt else None,
+        ))
+    return result
+
 @router.delete("/{document_id}")
 def delete_document(
     document_id: uuid.UUID,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: schemas.TokenUser = Depends(get_current_user)
 ) -> Any:
     """
     Delete a document from DB and the actual file from server
@@ -100,16 +277,19 @@ def delete_document(
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    # Try to delete the physical file
-    if os.path.exists(doc.file_path):
+    # Try to delete the physical files of every version, raw or compressed
+    for file_path in storage.document_paths(db, doc):
         try:
-            os.remove(doc.file_path)
+            storage.remove(file_path)
         except Exception as e:
             # We log the error but continue to delete the DB record
             print(f"Error deleting file: {e}")
 
     # Delete the database record
+    stats.document_removed(db, doc)
     db.delete(doc)
     db.commit()
 
+    recorder.record(current_user.id, "document", f"Deleted {doc.filename}")
+
     return {"message": "Document deleted successfully"}
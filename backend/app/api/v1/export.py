@@ -0,0 +1,200 @@
+import io
+import itertools
+import json
+import os
+import uuid
+import zipfile
+from datetime import datetime
+from typing import Any, Iterable, Iterator
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from app import models, schemas
+from app.core import storage
+from app.core.database import SessionLocal
+from app.api.deps import get_current_user
+from app.api.v1.summary import MOCK_SUMMARIES
+
+router = APIRouter()
+
+# How much of a file we read (and compress) before handing bytes to the response
+READ_CHUNK_SIZE = 1024 * 1024
+
+# Rows fetched per round trip from the server-side cursor
+CURSOR_BATCH_SIZE = 500
+
+# --- HELPER FUNCTIONS ---
+
+# Write-only file object that collects what ZipFile writes until we drain it into the response.
+# It can't seek, so ZipFile writes every entry in streaming mode (sizes in a data descriptor).
+class StreamBuffer(io.RawIOBase):
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def document_manifest(doc: models.Document) -> dict:
+    return {
+        "id": str(doc.id),
+        "filename": doc.filename,
+        "file_type": doc.file_type,
+        "size": doc.size,
+        "status": doc.status,
+        "current_version": doc.current_version,
+        "created_at": doc.created_at.isoformat() if doc.created_at else None,
+        "processed_at": doc.processed_at.isoformat() if doc.processed_at else None,
+        "duplicate_of_id": str(doc.duplicate_of_id) if doc.duplicate_of_id else None,
+        "archive_path": archive_path(doc),
+    }
+
+def archive_path(doc: models.Document) -> str:
+    return f"files/{doc.id}_{os.path.basename(doc.filename)}"
+
+def summary_manifest(summary: dict) -> dict:
+    chapter_id = summary.get("chapter_id")
+    return {
+        "document_id": str(summary["document_id"]),
+        "chapter_id": str(chapter_id) if chapter_id else None,
+        "content": summary["content"],
+        "status": summary["status"],
+    }
+
+# Turn ordered (quiz, question) rows into one manifest item per quiz
+def group_quizzes(rows: Iterable) -> Iterator[dict]:
+    for _, group in itertools.groupby(rows, key=lambda row: row[0].id):
+        group = list(group)
+        quiz = group[0][0]
+        yield {
+            "id": str(quiz.id),
+            "document_id": str(quiz.document_id),
+            "title": quiz.title,
+            "difficulty": quiz.difficulty,
+            "status": quiz.status,
+            "created_at": quiz.created_at.isoformat() if quiz.created_at else None,
+            "questions": [
+                {
+                    "text": question.text,
+                    "type": question.type,
+                    "options": question.options,
+                    "correct_index": question.correct_index,
+                    "explanation": question.explanation,
+                }
+                for _, question in group
+            ],
+        }
+
+# Write a JSON array entry one item at a time, yielding compressed bytes as we go
+def write_json_array(archive: zipfile.ZipFile, buffer: StreamBuffer, name: str, items: Iterable[dict]) -> Iterator[bytes]:
+    with archive.open(name, "w") as entry:
+        entry.write(b"[")
+        for index, item in enumerate(items):
+            if index:
+                entry.write(b",")
+            entry.write(json.dumps(item, default=str).encode("utf-8"))
+            data = buffer.drain()
+            if data:
+                yield data
+        entry.write(b"]")
+    yield buffer.drain()
+
+def stream_library(user_id: uuid.UUID) -> Iterator[bytes]:
+    """
+    Build the ZIP while it is being sent. Rows come from server-side cursors and
+    files are copied in chunks, so memory use doesn't depend on the library size.
+    """
+    # The request's session may be closed before the body is sent, so we use our own
+    db = SessionLocal()
+    buffer = StreamBuffer()
+    try:
+        # Level 1: most uploads (PDF, DOCX) are compressed already, so we favour speed
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+            documents = db.query(models.Document).filter(
+                models.Document.user_id == user_id
+            ).order_by(models.Document.created_at).yield_per(CURSOR_BATCH_SIZE)
+
+            yield from write_json_array(
+                archive, buffer, "documents.json", (document_manifest(doc) for doc in documents)
+            )
+
+            # Summaries are still kept in memory by the summary router: whole
+            # documents by document id, chapters by (document id, chapter id)
+            document_keys = (
+                document_id for (document_id,) in db.query(models.Document.id).filter(
+                    models.Document.user_id == user_id
+                ).yield_per(CURSOR_BATCH_SIZE)
+            )
+            chapter_keys = (
+                (document_id, chapter_id) for document_id, chapter_id in db.query(
+                    models.Chapter.document_id, models.Chapter.id
+                ).join(
+                    models.Document, models.Document.id == models.Chapter.document_id
+                ).filter(
+                    models.Document.user_id == user_id
+                ).order_by(models.Chapter.document_id, models.Chapter.version, models.Chapter.position).yield_per(CURSOR_BATCH_SIZE)
+            )
+            summaries = (
+                summary_manifest(summary)
+                for key in itertools.chain(document_keys, chapter_keys)
+                for summary in [MOCK_SUMMARIES.get(key)]
+                if summary is not None
+            )
+            yield from write_json_array(archive, buffer, "summaries.json", summaries)
+
+            # One ordered cursor over all questions, grouped into quizzes on the fly
+            question_rows = db.query(models.Quiz, models.QuizQuestion).join(
+                models.QuizQuestion, models.QuizQuestion.quiz_id == models.Quiz.id
+            ).filter(
+                models.Quiz.user_id == user_id
+            ).order_by(models.Quiz.created_at, models.Quiz.id, models.QuizQuestion.position).yield_per(CURSOR_BATCH_SIZE)
+            yield from write_json_array(archive, buffer, "quizzes.json", group_quizzes(question_rows))
+
+            # The files themselves, decompressed on the fly if they are in the cold tier
+            documents = db.query(models.Document).filter(
+                models.Document.user_id == user_id
+            ).order_by(models.Document.created_at).yield_per(CURSOR_BATCH_SIZE)
+            for doc in documents:
+                # A missing file is left out; documents.json still lists the document
+                if not storage.exists(doc.file_path):
+                    continue
+                # Entries over 2 GB need zip64 headers, which must be chosen before writing
+                large = storage.file_size(doc.file_path) >= zipfile.ZIP64_LIMIT
+                with storage.open_file(doc.file_path) as source, archive.open(archive_path(doc), "w", force_zip64=large) as entry:
+                    while True:
+                        chunk = source.read(READ_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        entry.write(chunk)
+                        data = buffer.drain()
+                        if data:
+                            yield data
+                yield buffer.drain()
+        # Closing the archive writes the central directory
+        yield buffer.drain()
+    finally:
+        db.close()
+
+# --- API ENDPOINTS ---
+
+@router.get("/")
+def export_library(
+    current_user: schemas.TokenUser = Depends(get_current_user)
+) -> Any:
+    """
+    Download the user's whole library (files, summaries and quizzes) as a ZIP
+    """
+    filename = f"lokai-library-{datetime.utcnow():%Y%m%d}.zip"
+    return StreamingResponse(
+        stream_library(current_user.id),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,125 @@
+import mimetypes
+import os
+import re
+from typing import Any, BinaryIO, Iterator, Optional, Tuple
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core import storage
+from app.core.database import get_db
+from app.api.v1.documents import UPLOAD_DIR
+
+# Serves uploaded files like StaticFiles did, but through the storage layer:
+# cold files are decompressed frame by frame and range requests only
+# decompress the frames they cover.
+router = APIRouter()
+
+READ_CHUNK_SIZE = 64 * 1024
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# --- HELPER FUNCTIONS ---
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    The (start, end) bytes of a single-range header, both included.
+    None means "send the whole file": no header, several ranges or an invalid
+    one like "bytes=10-5", all of which we are allowed to ignore.
+    Raises 416 for a range that starts past the end of the file.
+    """
+    if not header:
+        return None
+    match = RANGE_PATTERN.match(header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    start, end = match.groups()
+    if start == "":
+        # "bytes=-500" is the last 500 bytes
+        start, end = max(0, size - int(end)), size - 1
+    else:
+        if end and int(end) < int(start):
+            return None
+        start, end = int(start), min(int(end), size - 1) if end else size - 1
+    if start >= size:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
+def iter_file(f: BinaryIO, start: int, length: int) -> Iterator[bytes]:
+    try:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(READ_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
+
+# --- API ENDPOINTS ---
+
+@router.api_route("/{filename}", methods=["GET", "HEAD"])
+def read_upload(
+    filename: str,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    Download an uploaded file, whole or as a byte range.
+    HEAD returns the same headers without the body.
+    """
+    # Only plain file names inside the uploads folder
+    if os.path.basename(filename) != filename or filename.startswith(".") or filename.endswith(storage.COMPRESSED_SUFFIX):
+        raise HTTPException(status_code=404, detail="Not Found")
+    path = os.path.join(UPLOAD_DIR, filename)
+
+    try:
+        f = storage.open_file(path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    try:
+        size = f.seek(0, os.SEEK_END)
+        byte_range = parse_range(request.headers.get("range"), size)
+
+        # Files of earlier versions aren't tracked; they stay in whatever tier they are.
+        # HEAD doesn't read the file, so it doesn't count as an access.
+        doc = None
+        if request.method != "HEAD":
+            doc = db.query(models.Document).filter(models.Document.file_path == path).first()
+        if doc is not None:
+            if storage.touch(db, doc):
+                # Used again: serve this request from the compressed file, later ones from the raw file
+                background_tasks.add_task(storage.promote_document, doc.id)
+            db.commit()
+    except Exception:
+        f.close()
+        raise
+
+    media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    headers = {"Accept-Ranges": "bytes"}
+    status_code = 200
+    start, length = 0, size
+    if byte_range is not None:
+        start, end = byte_range
+        length = end - start + 1
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(length)
+
+    if request.method == "HEAD":
+        f.close()
+        return Response(status_code=status_code, media_type=media_type, headers=headers)
+    return StreamingResponse(
+        iter_file(f, start, length),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers,
+    )
@@ -1,15 +1,28 @@
 import uuid
 import asyncio
-from typing import Any, List
+from typing import Any, List, Optional
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.core import chapters, dedup, scheduler
+from app.core.activity import recorder
+from app.core.database import get_db
+from app.api.deps import get_current_user
 
 router = APIRouter()
 
-# --- MOCK DATA STRUCTURES ---
+# --- DATA STRUCTURES ---
 
 class QuizGenerateRequest(BaseModel):
     document_id: uuid.UUID
+    chapter_id: Optional[uuid.UUID] = None # Only quiz this chapter instead of the whole document
+
+class QuizShareRequest(BaseModel):
+    shared: bool
 
 class QuestionResponse(BaseModel):
     id: int
@@ -22,135 +35,266 @@ class QuestionResponse(BaseModel):
 class QuizResponse(BaseModel):
     id: uuid.UUID
     document_id: uuid.UUID
+    chapter_id: Optional[uuid.UUID] = None
     document_name: str = "Unknown Document"
     difficulty: str = "Medium"
     title: str
     questions: List[QuestionResponse]
     status: str # 'Generating' | 'Ready' | 'Failed'
+    shared: bool = False
+
+# Generation is still mocked: every quiz gets these questions
+MOCK_QUESTIONS = [
+    {
+        "text": "What is the primary function of the mitochondria?",
+        "type": "multiple_choice",
+        "options": ["Energy production", "Protein synthesis", "Waste disposal", "Cell division"],
+        "correct_index": 0,
+        "explanation": "Mitochondria are known as the powerhouse of the cell because they generate most of the cell's supply of adenosine triphosphate (ATP), used as a source of chemical energy."
+    },
+    {
+        "text": "DNA analysis is NOT used in the process described in the document.",
+        "type": "true_false",
+        "options": ["True", "False"],
+        "correct_index": 1,
+        "explanation": "The document explicitly mentions that DNA analysis is a key component of the verification process."
+    },
+    {
+        "text": "Which year was the original protocol established?",
+        "type": "multiple_choice",
+        "options": ["1995", "2001", "2010", "2023"],
+        "correct_index": 1,
+        "explanation": "Section 2.1 states that the original protocol was established in 2001 following the initial study."
+    }
+]
+
+# --- HELPER FUNCTIONS ---
+
+def get_user_quiz(db: Session, quiz_id: uuid.UUID, user_id: uuid.UUID) -> models.Quiz:
+    quiz = db.query(models.Quiz).filter(
+        models.Quiz.id == quiz_id,
+        models.Quiz.user_id == user_id
+    ).first()
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    return quiz
 
-# In-memory storage for our mock quizzes
-# Format: { quiz_id: QuizResponse }
-MOCK_QUIZZES = {}
+# Filter for the quizzes a user may take: their own, and the shared quizzes
+# of users in their department
+def accessible_quizzes(user: schemas.TokenUser):
+    if user.department is None:
+        return models.Quiz.user_id == user.id
+    department_users = select(models.User.id).where(models.User.department == user.department)
+    return or_(
+        models.Quiz.user_id == user.id,
+        and_(models.Quiz.shared.is_(True), models.Quiz.user_id.in_(department_users))
+    )
+
+def get_accessible_quiz(db: Session, quiz_id: uuid.UUID, user: schemas.TokenUser) -> models.Quiz:
+    quiz = db.query(models.Quiz).filter(
+        models.Quiz.id == quiz_id,
+        accessible_quizzes(user)
+    ).first()
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    return quiz
+
+def get_questions(db: Session, quiz_id: uuid.UUID) -> List[models.QuizQuestion]:
+    return db.query(models.QuizQuestion).filter(
+        models.QuizQuestion.quiz_id == quiz_id
+    ).order_by(models.QuizQuestion.position).all()
+
+def to_response(quiz: models.Quiz, questions: List[models.QuizQuestion], document_name: str) -> dict:
+    return {
+        "id": quiz.id,
+        "document_id": quiz.document_id,
+        "chapter_id": quiz.chapter_id,
+        "document_name": document_name or "Unknown Document",
+        "difficulty": quiz.difficulty,
+        "title": quiz.title,
+        "questions": [
+            {
+                "id": question.id,
+                "text": question.text,
+                "type": question.type,
+                "options": question.options,
+                "correct_index": question.correct_index,
+                "explanation": question.explanation or "",
+            }
+            for question in questions
+        ],
+        "status": quiz.status,
+        "shared": bool(quiz.shared),
+    }
+
+# Reuse a quiz of the original document when this one is a near-duplicate,
+# otherwise store a new (mock) quiz. Returns the quiz id.
+def create_quiz(
+    db: Session, user_id: uuid.UUID, document_id: uuid.UUID, chapter_id: Optional[uuid.UUID] = None
+) -> uuid.UUID:
+    doc = db.query(models.Document).filter(
+        models.Document.id == document_id,
+        models.Document.user_id == user_id
+    ).first()
+    if not doc:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    chapter = None
+    if chapter_id is not None:
+        chapter = chapters.get_chapter(db, doc.id, chapter_id)
+        if not chapter:
+            raise HTTPException(status_code=404, detail="Chapter not found")
+
+    original_id = dedup.canonical_document_id(db, document_id)
+    if chapter is None and original_id != document_id:
+        existing = db.query(models.Quiz.id).filter(
+            models.Quiz.document_id == original_id,
+            models.Quiz.user_id == user_id,
+            models.Quiz.status == "Ready"
+        ).first()
+        if existing:
+            return existing.id
+
+    # Only the pages of the chapter are loaded. Generation is still mocked,
+    # so the text is not used yet beyond checking that there is some.
+    if chapter is not None and not chapters.source_text(db, doc, chapter).strip():
+        raise HTTPException(status_code=400, detail="This chapter has no extracted text")
+
+    quiz = models.Quiz(
+        user_id=user_id,
+        document_id=document_id,
+        chapter_id=chapter.id if chapter else None,
+        title=f"{chapter.title} Quiz" if chapter else "Generated Quiz",
+        status="Ready"
+    )
+    db.add(quiz)
+    db.flush()
+    db.add_all(
+        models.QuizQuestion(quiz_id=quiz.id, position=position, **question)
+        for position, question in enumerate(MOCK_QUESTIONS, start=1)
+    )
+    db.commit()
+    return quiz.id
 
 # --- API ENDPOINTS ---
 
 @router.post("/generate", response_model=dict)
-async def generate_quiz(request: QuizGenerateRequest) -> Any:
+async def generate_quiz(
+    request: QuizGenerateRequest,
+    db: Session = Depends(get_db),
+    current_user: schemas.TokenUser = Depends(get_current_user)
+) -> Any:
     """
     Simulate generating a quiz from a document.
-    Returns (immediately) with a 'Generating' status and a new quiz ID.
+    Returns with a 'Ready' status and the new quiz ID.
     """
-    # Create a new fake quiz ID
-    new_quiz_id = uuid.uuid4()
-    
-    # Store a "Ready" quiz in our mock DB
-    # We simulate that it takes 0 seconds to generate for this mock, 
-    # but the UI will show a loader for effect if needed.
-    
-    mock_questions = [
-        {
-            "id": 1,
-            "text": "What is the primary function of the mitochondria?",
-            "type": "multiple_choice",
-            "options": ["Energy production", "Protein synthesis", "Waste disposal", "Cell division"],
-            "correct_index": 0,
-            "explanation": "Mitochondria are known as the powerhouse of the cell because they generate most of the cell's supply of adenosine triphosphate (ATP), used as a source of chemical energy."
-        },
-        {
-            "id": 2,
-            "text": "DNA analysis is NOT used in the process described in the document.",
-            "type": "true_false",
-            "options": ["True", "False"],
-            "correct_index": 1,
-            "explanation": "The document explicitly mentions that DNA analysis is a key component of the verification process."
-        },
-        {
-            "id": 3,
-            "text": "Which year was the original protocol established?",
-            "type": "multiple_choice",
-            "options": ["1995", "2001", "2010", "2023"],
-            "correct_index": 1,
-            "explanation": "Section 2.1 states that the original protocol was established in 2001 following the initial study."
-        }
-    ]
-    
-    mock_quiz = {
-        "id": new_quiz_id,
-        "document_id": request.document_id,
-        "title": "Generated Quiz",
-        "questions": mock_questions,
-        "status": "Ready"
-    }
-    
-    MOCK_QUIZZES[new_quiz_id] = mock_quiz
-    
+    quiz_id = await run_in_threadpool(
+        create_quiz, db, current_user.id, request.document_id, request.chapter_id
+    )
+
     # We'll simulate a slight delay just for the UI to feel "real"
     await asyncio.sleep(2)
-    
-    return {"quiz_id": new_quiz_id, "status": "Ready"}
+
+    return {"quiz_id": quiz_id, "status": "Ready"}
 
 @router.get("/", response_model=List[QuizResponse])
-async def list_quizzes() -> Any:
+def list_quizzes(
+    db: Session = Depends(get_db),
+    current_user: schemas.TokenUser = Depends(get_current_user)
+) -> Any:
     """
-    List all available quizzes.
-    For mock purposes, returns a static list of sample quizzes + any generated in session.
+    List the quizzes the logged-in user can take (without their questions):
+    their own and those shared in their department.
     """
-    # Static mock data since we don't have persistence yet
-    static_mocks = [
-        {
-            "id": uuid.uuid4(),
-            "document_id": uuid.uuid4(),
-            "document_name": "Indian Constitution Guide.pdf",
-            "difficulty": "Easy",
-            "title": "Indian Constitution: Fundamental Rights",
-            "questions": [],
-            "status": "Completed"
-        },
-        {
-            "id": uuid.uuid4(),
-            "document_id": uuid.uuid4(),
-            "document_name": "Modern History Vol 1.pdf",
-            "difficulty": "Medium",
-            "title": "Modern History: 1857 Revolt",
-            "questions": [],
-            "status": "In Progress"
-        },
-        {
-            "id": uuid.uuid4(),
-            "document_id": uuid.uuid4(),
-            "document_name": "Physical Geography.pdf",
-            "difficulty": "Hard",
-            "title": "Geography: River Systems of India",
-            "questions": [],
-            "status": "New"
-        }
-    ]
-    
-    # Combine static mocks with any quizzes generated during this server session
-    return list(MOCK_QUIZZES.values()) + static_mocks
+    rows = db.query(models.Quiz, models.Document.filename).join(
+        models.Document, models.Document.id == models.Quiz.document_id
+    ).filter(
+        accessible_quizzes(current_user)
+    ).order_by(models.Quiz.created_at.desc()).all()
+
+    return [to_response(quiz, [], filename) for quiz, filename in rows]
 
 @router.get("/{quiz_id}", response_model=QuizResponse)
-async def get_quiz(quiz_id: uuid.UUID) -> Any:
+def get_quiz(
+    quiz_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: schemas.TokenUser = Depends(get_current_user)
+) -> Any:
     """
     Get a specific quiz by ID.
     """
-    if quiz_id in MOCK_QUIZZES:
-        return MOCK_QUIZZES[quiz_id]
-    
-    # Fallback if we restart server and lose memory, just return a generic one for dev flow
-    return {
-        "id": quiz_id,
-        "document_id": uuid.uuid4(),
-        "title": "Mock Quiz (Server Restarted)",
-        "questions": [
-             {
-                "id": 1,
-                "text": "The server was restarted, so this is a fallback question.",
-                "type": "multiple_choice",
-                "options": ["Option A", "Option B", "Option C", "Option D"],
-                "correct_index": 0,
-                "explanation": "We lost the in-memory data."
-            }
-        ],
-        "status": "Ready"
-    }
+    quiz = get_accessible_quiz(db, quiz_id, current_user)
+    doc = db.get(models.Document, quiz.document_id)
+    return to_response(quiz, get_questions(db, quiz.id), doc.filename if doc else None)
+
+@router.put("/{quiz_id}/sharing", response_model=QuizResponse)
+def share_quiz(
+    quiz_id: uuid.UUID,
+    share_in: QuizShareRequest,
+    db: Session = Depends(get_db),
+    current_user: schemas.TokenUser = Depends(get_current_user)
+) -> Any:
+    """
+    Share a quiz with the owner's department, or stop sharing it. Only the
+    owner can do this. Attempts already made stay in the analytics.
+    """
+    quiz = get_user_quiz(db, quiz_id, current_user.id)
+    quiz.shared = share_in.shared
+    db.commit()
+    doc = db.get(models.Document, quiz.document_id)
+    return to_response(quiz, get_questions(db, quiz.id), doc.filename if doc else None)
+
+@router.post("/{quiz_id}/attempts", response_model=schemas.AttemptResponse)
+def submit_attempt(
+    quiz_id: uuid.UUID,
+    attempt_in: schemas.AttemptSubmit,
+    db: Session = Depends(get_db),
+    current_user: schemas.TokenUser = Depends(get_current_user)
+) -> Any:
+    """
+    Grade the answers of a quiz and schedule its questions for review.
+    """
+    quiz = get_accessible_quiz(db, quiz_id, current_user)
+    questions = {question.id: question for question in get_questions(db, quiz.id)}
+
+    answers = [answer.model_dump() for answer in attempt_in.answers]
+    if any(answer["question_id"] not in questions for answer in answers):
+        raise HTTPException(status_code=400, detail="Answer for a question that is not part of this quiz")
+    # The score is over the whole quiz: every question once, no more, no less
+    answered = [answer["question_id"] for answer in answers]
+    if len(set(answered)) != len(answered):
+        raise HTTPException(status_code=400, detail="A question was answered more than once")
+    if len(answered) != len(questions):
+        raise HTTPException(status_code=400, detail="Every question of the quiz must be answered")
+    if any(not 0 <= answer["selected_index"] < len(questions[answer["question_id"]].options) for answer in answers):
+        raise HTTPException(status_code=400, detail="Selected option does not exist")
+
+    attempt, results = scheduler.grade_attempt(db, current_user.id, questions, answers, quiz_id=quiz.id)
+    db.commit()
+
+    recorder.record(current_user.id, "quiz", f"Completed {quiz.title} ({attempt.score:.0f}%)")
+
+    return schemas.AttemptResponse(
+        id=attempt.id,
+        quiz_id=attempt.quiz_id,
+        correct_count=attempt.correct_count,
+        total_count=attempt.total_count,
+        score=attempt.score,
+        created_at=attempt.created_at,
+        results=results,
+    )
+
+@router.get("/{quiz_id}/attempts", response_model=List[schemas.AttemptResponse])
+def list_attempts(
+    quiz_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: schemas.TokenUser = Depends(get_current_user)
+) -> Any:
+    """
+    Get the user's earlier attempts of a quiz, newest first
+    """
+    quiz = get_accessible_quiz(db, quiz_id, current_user)
+    return db.query(models.QuizAttempt).filter(
+        models.QuizAttempt.quiz_id == quiz.id,
+        models.QuizAttempt.user_id == current_user.id
+    ).order_by(models.QuizAttempt.created_at.desc()).all()
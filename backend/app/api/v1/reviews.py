@@ -0,0 +1,78 @@
+from typing import Any, List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.core import scheduler
+from app.core.database import get_db
+from app.api.deps import get_current_user
+from app.api.v1.quizzes import accessible_quizzes
+
+router = APIRouter()
+
+# --- API ENDPOINTS ---
+
+@router.get("/due", response_model=List[schemas.ReviewQuestionResponse])
+def get_due_questions(
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: schemas.TokenUser = Depends(get_current_user)
+) -> Any:
+    """
+    Get the next questions the user should review, most overdue first
+    """
+    return [
+        schemas.ReviewQuestionResponse(
+            id=question.id,
+            quiz_id=question.quiz_id,
+            text=question.text,
+            type=question.type,
+            options=question.options,
+            correct_index=question.correct_index,
+            explanation=question.explanation or "",
+            due_at=state.due_at,
+            repetitions=state.repetitions,
+            interval_days=state.interval_days,
+        )
+        for state, question in scheduler.due_questions(db, current_user.id, limit)
+    ]
+
+@router.post("/", response_model=schemas.AttemptResponse)
+def submit_review(
+    review_in: schemas.AttemptSubmit,
+    db: Session = Depends(get_db),
+    current_user: schemas.TokenUser = Depends(get_current_user)
+) -> Any:
+    """
+    Grade answers to review questions and reschedule them
+    """
+    question_ids = {answer.question_id for answer in review_in.answers}
+    # Only questions of quizzes the user can take can be reviewed
+    questions = {
+        question.id: question for question in db.query(models.QuizQuestion).join(
+            models.Quiz, models.Quiz.id == models.QuizQuestion.quiz_id
+        ).filter(
+            models.QuizQuestion.id.in_(question_ids),
+            accessible_quizzes(current_user)
+        )
+    }
+    if len(questions) != len(question_ids):
+        raise HTTPException(status_code=400, detail="Unknown question in review")
+
+    answers = [answer.model_dump() for answer in review_in.answers]
+    if len(question_ids) != len(answers):
+        raise HTTPException(status_code=400, detail="A question was answered more than once")
+    if any(not 0 <= answer["selected_index"] < len(questions[answer["question_id"]].options) for answer in answers):
+        raise HTTPException(status_code=400, detail="Selected option does not exist")
+    attempt, results = scheduler.grade_attempt(db, current_user.id, questions, answers)
+    db.commit()
+
+    return schemas.AttemptResponse(
+        id=attempt.id,
+        quiz_id=None,
+        correct_count=attempt.correct_count,
+        total_count=attempt.total_count,
+        score=attempt.score,
+        created_at=attempt.created_at,
+        results=results,
+    )
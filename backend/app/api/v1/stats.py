@@ -0,0 +1,22 @@
+from typing import Any
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app import schemas
+from app.core import stats
+from app.core.database import get_db
+from app.api.deps import get_current_user
+
+router = APIRouter()
+
+# --- API ENDPOINTS ---
+
+@router.get("/", response_model=schemas.UserStatsResponse)
+def get_my_stats(
+    db: Session = Depends(get_db),
+    current_user: schemas.TokenUser = Depends(get_current_user)
+) -> Any:
+    """
+    Get the dashboard numbers of the logged-in user (one primary key lookup)
+    """
+    return schemas.UserStatsResponse(**stats.get_user_stats(db, current_user.id))
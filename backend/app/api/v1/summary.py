@@ -1,8 +1,15 @@
 import uuid
 import asyncio
-from typing import Any
+from typing import Any, Optional
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.core import chapters, dedup
+from app.core.database import get_db
+from app.api.deps import get_current_user
 
 router = APIRouter()
 
@@ -10,20 +17,69 @@ router = APIRouter()
 
 class SummaryResponse(BaseModel):
     document_id: uuid.UUID
+    chapter_id: Optional[uuid.UUID] = None
     content: str
     status: str # 'Generating' | 'Ready' | 'Failed'
 
-# In-memory storage for mock summaries
+# In-memory storage for mock summaries. Whole-document summaries are keyed by
+# document id, chapter summaries by (document id, chapter id).
 MOCK_SUMMARIES = {}
 
+# --- HELPER FUNCTIONS ---
+
+def get_user_document(db: Session, document_id: uuid.UUID, user_id: uuid.UUID) -> models.Document:
+    doc = db.query(models.Document).filter(
+        models.Document.id == document_id,
+        models.Document.user_id == user_id
+    ).first()
+    if not doc:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return doc
+
+# Text of only the chapter's pages. Generation is still mocked, so it is loaded
+# to validate the chapter but not used yet.
+def load_chapter_text(db: Session, doc: models.Document, chapter_id: uuid.UUID) -> str:
+    chapter = chapters.get_chapter(db, doc.id, chapter_id)
+    if not chapter:
+        raise HTTPException(status_code=404, detail="Chapter not found")
+    text = chapters.source_text(db, doc, chapter)
+    if not text.strip():
+        raise HTTPException(status_code=400, detail="This chapter has no extracted text")
+    return text
+
 # --- API ENDPOINTS ---
 
 @router.post("/{document_id}", response_model=SummaryResponse)
-async def generate_summary(document_id: uuid.UUID) -> Any:
+async def generate_summary(
+    document_id: uuid.UUID,
+    chapter_id: Optional[uuid.UUID] = None,
+    db: Session = Depends(get_db),
+    current_user: schemas.TokenUser = Depends(get_current_user)
+) -> Any:
     """
-    Simulate generating a summary for a document.
+    Simulate generating a summary for a document, or for one of its chapters.
     """
-    
+    # Only the owner may look at a document's chapters and duplicates
+    doc = await run_in_threadpool(get_user_document, db, document_id, current_user.id)
+    if chapter_id is not None:
+        await run_in_threadpool(load_chapter_text, db, doc, chapter_id)
+        summary = {
+            "document_id": document_id,
+            "chapter_id": chapter_id,
+            "content": "This chapter covers a focused part of the document. Its key ideas, definitions and examples are summarised here.",
+            "status": "Ready"
+        }
+        MOCK_SUMMARIES[(document_id, chapter_id)] = summary
+        await asyncio.sleep(2)
+        return summary
+
+    # A near-duplicate reuses the summary of the original document
+    original_id = await run_in_threadpool(dedup.canonical_document_id, db, document_id)
+    if original_id != document_id and original_id in MOCK_SUMMARIES:
+        summary = {**MOCK_SUMMARIES[original_id], "document_id": document_id}
+        MOCK_SUMMARIES[document_id] = summary
+        return summary
+
     # Mock summary content
     mock_content = (
         "This document provides a comprehensive overview of the functionality and structure of mitochondria within eukaryotic cells. "
@@ -49,11 +105,12 @@ async def generate_summary(document_id: uuid.UUID) -> Any:
     return summary
 
 @router.get("/{document_id}", response_model=SummaryResponse)
-async def get_summary(document_id: uuid.UUID) -> Any:
+async def get_summary(document_id: uuid.UUID, chapter_id: Optional[uuid.UUID] = None) -> Any:
     """
     Get existing summary.
     """
-    if document_id in MOCK_SUMMARIES:
-        return MOCK_SUMMARIES[document_id]
+    key = (document_id, chapter_id) if chapter_id is not None else document_id
+    if key in MOCK_SUMMARIES:
+        return MOCK_SUMMARIES[key]
         
     raise HTTPException(status_code=404, detail="Summary not found")
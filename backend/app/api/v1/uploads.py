@@ -0,0 +1,309 @@
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, List
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Header, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.core import stats, versions
+from app.core.activity import recorder
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.processing import process_document
+from app.api.deps import get_current_user
+from app.api.v1.documents import UPLOAD_DIR, ensure_upload_dir
+
+router = APIRouter()
+
+# We collect this many bytes from the request stream before writing them to disk
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# --- HELPER FUNCTIONS ---
+
+def ensure_session_dir():
+    if not os.path.exists(settings.UPLOAD_SESSION_DIR):
+        os.makedirs(settings.UPLOAD_SESSION_DIR)
+
+# Reserve the full file size on disk up front, so chunks can be written at any offset
+def preallocate_file(path: str, size: int):
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    try:
+        if hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(fd, 0, size)
+        else:
+            os.ftruncate(fd, size)
+    finally:
+        os.close(fd)
+
+# Positioned write: several chunks can be written into the same file at the same time
+def write_at(fd: int, data: bytes, position: int):
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, position)
+        view = view[written:]
+        position += written
+
+# Add [start, end) to a sorted list of ranges and merge ranges that touch or overlap
+def merge_ranges(ranges: List[List[int]], start: int, end: int) -> List[List[int]]:
+    merged = []
+    for current in sorted(ranges + [[start, end]]):
+        if merged and current[0] <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], current[1])
+        else:
+            merged.append(list(current))
+    return merged
+
+# The resume offset is the end of the range that starts at byte 0
+def contiguous_offset(ranges: List[List[int]]) -> int:
+    if ranges and ranges[0][0] == 0:
+        return ranges[0][1]
+    return 0
+
+def remove_file(path: str):
+    if os.path.exists(path):
+        try:
+            os.remove(path)
+        except Exception as e:
+            print(f"Error deleting file: {e}")
+
+def to_response(upload: models.UploadSession) -> schemas.UploadSessionResponse:
+    ranges = upload.received_ranges or []
+    return schemas.UploadSessionResponse(
+        id=upload.id,
+        filename=upload.filename,
+        total_size=upload.total_size,
+        offset=contiguous_offset(ranges),
+        received_bytes=sum(end - start for start, end in ranges),
+        expires_at=upload.expires_at,
+    )
+
+def get_upload_session(
+    db: Session, upload_id: uuid.UUID, user_id: uuid.UUID, for_update: bool = False
+) -> models.UploadSession:
+    query = db.query(models.UploadSession).filter(
+        models.UploadSession.id == upload_id,
+        models.UploadSession.user_id == user_id
+    )
+    if for_update:
+        # Parallel chunks update the same row, so we lock it while merging ranges
+        query = query.with_for_update()
+    upload = query.first()
+    if not upload or upload.expires_at < datetime.utcnow():
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    return upload
+
+# Save the range of a finished chunk and push the expiry time forward
+def record_chunk(
+    db: Session, upload_id: uuid.UUID, user_id: uuid.UUID, start: int, end: int
+) -> models.UploadSession:
+    upload = get_upload_session(db, upload_id, user_id, for_update=True)
+    if end > start:
+        upload.received_ranges = merge_ranges(upload.received_ranges or [], start, end)
+    upload.updated_at = datetime.utcnow()
+    upload.expires_at = upload.updated_at + timedelta(minutes=settings.UPLOAD_SESSION_EXPIRE_MINUTES)
+    db.commit()
+    db.refresh(upload)
+    return upload
+
+# Remove abandoned sessions together with their partial files
+def purge_expired_uploads(db: Session) -> int:
+    expired = db.query(models.UploadSession).filter(
+        models.UploadSession.expires_at < datetime.utcnow()
+    ).all()
+    for upload in expired:
+        remove_file(upload.temp_path)
+        db.delete(upload)
+    db.commit()
+    return len(expired)
+
+# --- API ENDPOINTS ---
+
+@router.post("/", status_code=201, response_model=schemas.UploadSessionResponse)
+def create_upload(
+    upload_in: schemas.UploadSessionCreate,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: schemas.TokenUser = Depends(get_current_user)
+) -> Any:
+    """
+    Start a resumable upload. The file is preallocated and chunks are sent with PATCH.
+    """
+    if upload_in.size > settings.UPLOAD_MAX_SIZE:
+        raise HTTPException(status_code=413, detail="File is too large")
+
+    # Good moment to clean up sessions nobody finished
+    purge_expired_uploads(db)
+    ensure_session_dir()
+
+    upload_id = uuid.uuid4()
+    file_extension = os.path.splitext(upload_in.filename)[1]
+    temp_path = os.path.join(settings.UPLOAD_SESSION_DIR, f"{upload_id}.part")
+
+    try:
+        preallocate_file(temp_path, upload_in.size)
+    except OSError as e:
+        remove_file(temp_path)
+        raise HTTPException(status_code=500, detail=f"Could not reserve space for file: {str(e)}")
+
+    now = datetime.utcnow()
+    upload = models.UploadSession(
+        id=upload_id,
+        user_id=current_user.id,
+        filename=upload_in.filename,
+        file_type=file_extension.replace(".", ""),
+        total_size=upload_in.size,
+        temp_path=temp_path,
+        received_ranges=[],
+        created_at=now,
+        updated_at=now,
+        expires_at=now + timedelta(minutes=settings.UPLOAD_SESSION_EXPIRE_MINUTES)
+    )
+    db.add(upload)
+    db.commit()
+    db.refresh(upload)
+
+    response.headers["Location"] = f"{settings.API_V1_STR}/uploads/{upload.id}"
+    return to_response(upload)
+
+@router.head("/{upload_id}")
+def get_upload_offset(
+    upload_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: schemas.TokenUser = Depends(get_current_user)
+) -> Any:
+    """
+    Tell the client how many bytes we have, so it knows where to resume
+    """
+    upload = get_upload_session(db, upload_id, current_user.id)
+    return Response(status_code=200, headers={
+        "Upload-Offset": str(contiguous_offset(upload.received_ranges or [])),
+        "Upload-Length": str(upload.total_size),
+        "Cache-Control": "no-store",
+    })
+
+@router.get("/{upload_id}", response_model=schemas.UploadSessionResponse)
+def get_upload(
+    upload_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: schemas.TokenUser = Depends(get_current_user)
+) -> Any:
+    """
+    Get the full state of an upload, including chunks received after a gap
+    """
+    return to_response(get_upload_session(db, upload_id, current_user.id))
+
+@router.patch("/{upload_id}", status_code=204, response_model=None)
+async def upload_chunk(
+    upload_id: uuid.UUID,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset"),
+    db: Session = Depends(get_db),
+    current_user: schemas.TokenUser = Depends(get_current_user)
+) -> Any:
+    """
+    Write one chunk (the raw request body) at the given offset.
+    Chunks may be sent in parallel and in any order.
+    """
+    upload = await run_in_threadpool(get_upload_session, db, upload_id, current_user.id)
+    temp_path, total_size = upload.temp_path, upload.total_size
+    # Give the connection back to the pool while the body arrives, which can
+    # take long on a slow link; record_chunk locks the row again at the end
+    await run_in_threadpool(db.rollback)
+    if upload_offset < 0 or upload_offset >= total_size:
+        raise HTTPException(status_code=400, detail="Invalid Upload-Offset")
+
+    # The body is written as it arrives, so memory use does not depend on chunk size.
+    # All file I/O runs in the threadpool so a slow disk doesn't block the event loop.
+    position = upload_offset
+    fd = await run_in_threadpool(os.open, temp_path, os.O_WRONLY)
+    try:
+        buffer = bytearray()
+        async for piece in request.stream():
+            if position + len(buffer) + len(piece) > total_size:
+                raise HTTPException(status_code=413, detail="Chunk goes past the end of the file")
+            buffer += piece
+            if len(buffer) >= WRITE_BUFFER_SIZE:
+                await run_in_threadpool(write_at, fd, bytes(buffer), position)
+                position += len(buffer)
+                buffer.clear()
+        if buffer:
+            await run_in_threadpool(write_at, fd, bytes(buffer), position)
+            position += len(buffer)
+    finally:
+        await run_in_threadpool(os.close, fd)
+
+    upload = await run_in_threadpool(
+        record_chunk, db, upload_id, current_user.id, upload_offset, position
+    )
+    return Response(status_code=204, headers={
+        "Upload-Offset": str(contiguous_offset(upload.received_ranges or [])),
+    })
+
+@router.post("/{upload_id}/complete", response_model=schemas.DocumentResponse)
+def complete_upload(
+    upload_id: uuid.UUID,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: schemas.TokenUser = Depends(get_current_user)
+) -> Any:
+    """
+    Turn a fully received upload into a normal Document
+    """
+    upload = get_upload_session(db, upload_id, current_user.id, for_update=True)
+    if upload.received_ranges != [[0, upload.total_size]]:
+        raise HTTPException(status_code=409, detail="Upload is not complete yet")
+
+    ensure_upload_dir()
+    file_extension = f".{upload.file_type}" if upload.file_type else ""
+    file_path = os.path.join(UPLOAD_DIR, f"{upload.id}{file_extension}")
+
+    try:
+        os.replace(upload.temp_path, file_path)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Could not save file: {str(e)}")
+
+    new_doc = models.Document(
+        id=upload.id,
+        user_id=current_user.id,
+        filename=upload.filename,
+        file_path=file_path,
+        file_type=upload.file_type,
+        size=upload.total_size,
+        status="Processing" # Initial status
+    )
+    try:
+        db.add(new_doc)
+        db.delete(upload)
+        db.flush()
+        versions.add_version(db, new_doc, upload.filename, file_path, upload.total_size)
+        stats.document_added(db, new_doc)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        # Put the file back so the session can be completed again (or expire with its file)
+        os.replace(file_path, upload.temp_path)
+        raise HTTPException(status_code=500, detail=f"Could not save document: {str(e)}")
+    db.refresh(new_doc)
+
+    recorder.record(current_user.id, "document", f"Uploaded {new_doc.filename}")
+    background_tasks.add_task(process_document, new_doc.id)
+
+    return new_doc
+
+@router.delete("/{upload_id}")
+def cancel_upload(
+    upload_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: schemas.TokenUser = Depends(get_current_user)
+) -> Any:
+    """
+    Abort an upload and free its disk space
+    """
+    upload = get_upload_session(db, upload_id, current_user.id)
+    remove_file(upload.temp_path)
+    db.delete(upload)
+    db.commit()
+
+    return {"message": "Upload cancelled"}
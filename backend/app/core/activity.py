@@ -0,0 +1,119 @@
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert, update
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app import models
+
+# Write-behind recorder for activity events and login bookkeeping.
+# Requests only append to an in-memory buffer; a background thread writes
+# everything in one bulk INSERT/UPDATE when the buffer is big enough or
+# when the flush interval has passed.
+class ActivityRecorder:
+    def __init__(
+        self,
+        flush_size: int = settings.ACTIVITY_FLUSH_SIZE,
+        flush_interval: float = settings.ACTIVITY_FLUSH_INTERVAL_SECONDS,
+        max_buffer: int = settings.ACTIVITY_BUFFER_MAX,
+    ):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+
+        self._lock = threading.Lock()
+        self._events: List[Dict[str, Any]] = []
+        self._last_logins: Dict[uuid.UUID, datetime] = {} # Only the latest login per user matters
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="activity-recorder", daemon=True)
+        self._thread.start()
+
+    # Stop the background thread and write whatever is still buffered
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        self._thread.join()
+        self._thread = None
+        self.flush()
+
+    def record(self, user_id: uuid.UUID, type: str, title: str, details: Optional[dict] = None):
+        event = {
+            "user_id": user_id,
+            "type": type,
+            "title": title[:255],
+            "details": details or {},
+            "created_at": datetime.utcnow(),
+        }
+        with self._lock:
+            self._events.append(event)
+            if len(self._events) > self.max_buffer:
+                del self._events[: len(self._events) - self.max_buffer]
+            buffered = len(self._events)
+        if buffered >= self.flush_size:
+            self._wakeup.set()
+
+    def record_login(self, user_id: uuid.UUID):
+        now = datetime.utcnow()
+        with self._lock:
+            self._last_logins[user_id] = now
+        self.record(user_id, "login", "Signed in")
+
+    # Events of a user that are not in the database yet, newest first
+    def pending_for(self, user_id: uuid.UUID) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [event for event in reversed(self._events) if event["user_id"] == user_id]
+
+    def flush(self) -> int:
+        with self._lock:
+            events, self._events = self._events, []
+            last_logins, self._last_logins = self._last_logins, {}
+        if not events and not last_logins:
+            return 0
+
+        db = SessionLocal()
+        try:
+            if events:
+                db.execute(insert(models.Activity), events)
+            if last_logins:
+                # ORM bulk UPDATE by primary key: one executemany for all users
+                db.execute(
+                    update(models.User),
+                    [{"id": user_id, "last_login": ts} for user_id, ts in last_logins.items()],
+                )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Error flushing activity events: {e}")
+            # Put everything back so the next flush can try again
+            with self._lock:
+                self._events = (events + self._events)[-self.max_buffer:]
+                for user_id, ts in last_logins.items():
+                    # A login recorded meanwhile is newer, keep that one
+                    self._last_logins.setdefault(user_id, ts)
+            return 0
+        finally:
+            db.close()
+        return len(events)
+
+    def _run(self):
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._stopping:
+                break
+            self.flush()
+
+# Shared recorder, started and stopped together with the app (see app/main.py)
+recorder = ActivityRecorder()
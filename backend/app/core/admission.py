@@ -0,0 +1,162 @@
+import asyncio
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import anyio.to_thread
+from starlette.responses import JSONResponse
+
+from app.core.config import settings
+
+# Priority classes. Critical requests (auth) are always admitted, normal ones
+# (cheap reads) are shed only when the server is overloaded, low priority ones
+# (generation, bulk listing) are shed as soon as the server gets busy.
+PRIORITY_CRITICAL = "critical"
+PRIORITY_NORMAL = "normal"
+PRIORITY_LOW = "low"
+
+LOAD_OK = "ok"
+LOAD_BUSY = "busy"
+LOAD_OVERLOADED = "overloaded"
+
+# How often we check if the event loop is running late
+LOOP_LAG_INTERVAL_SECONDS = 0.1
+
+# Keeps track of load signals and decides which requests are let in
+class AdmissionController:
+    def __init__(self):
+        # (path prefix, methods or None for all, priority, streaming, exact)
+        self._rules: List[Tuple[str, Optional[frozenset], str, bool, bool]] = []
+        self.in_flight = 0
+        # Long-lived requests (downloads, uploads) are counted apart, see set_priority
+        self.streaming = 0
+        self.loop_lag = 0.0 # Smoothed event loop lag in seconds
+        self.rejected: Dict[str, int] = {PRIORITY_CRITICAL: 0, PRIORITY_NORMAL: 0, PRIORITY_LOW: 0}
+        self._monitor: Optional[asyncio.Task] = None
+
+    def set_priority(
+        self, prefix: str, priority: str, methods: Optional[Iterable[str]] = None,
+        streaming: bool = False, exact: bool = False
+    ):
+        """
+        Give every request under a path prefix a priority class, or with exact
+        only requests for that path itself (a trailing slash doesn't matter).
+        The longest matching prefix wins.
+        Streaming requests spend most of their time waiting on the client, so
+        they don't count towards in_flight but have their own limit
+        (ADMISSION_MAX_STREAMING).
+        """
+        prefix = prefix.rstrip("/")
+        methods = frozenset(m.upper() for m in methods) if methods else None
+        self._rules.append((prefix, methods, priority, streaming, exact))
+        # Longest prefix first; exact rules and rules limited to some methods before catch-all rules
+        self._rules.sort(key=lambda rule: (len(rule[0]), rule[4], rule[1] is not None), reverse=True)
+
+    def rule_for(self, method: str, path: str) -> Tuple[str, bool]:
+        """
+        The (priority, streaming) of a request
+        """
+        for prefix, methods, priority, streaming, exact in self._rules:
+            if exact:
+                if path.rstrip("/") != prefix:
+                    continue
+            elif path != prefix and not path.startswith(prefix + "/"):
+                continue
+            if methods is not None and method not in methods:
+                continue
+            return priority, streaming
+        return PRIORITY_NORMAL, False
+
+    def load_level(self) -> str:
+        stats = anyio.to_thread.current_default_thread_limiter().statistics()
+        waiting = stats.tasks_waiting
+        lag_ms = self.loop_lag * 1000
+
+        if (
+            self.in_flight >= settings.ADMISSION_MAX_IN_FLIGHT
+            or waiting >= settings.ADMISSION_MAX_THREADPOOL_WAITING
+            or lag_ms >= settings.ADMISSION_MAX_LOOP_LAG_MS
+        ):
+            return LOAD_OVERLOADED
+        if (
+            self.in_flight >= settings.ADMISSION_BUSY_IN_FLIGHT
+            or waiting >= settings.ADMISSION_BUSY_THREADPOOL_WAITING
+            or lag_ms >= settings.ADMISSION_BUSY_LOOP_LAG_MS
+        ):
+            return LOAD_BUSY
+        return LOAD_OK
+
+    def admit(self, priority: str, streaming: bool = False) -> bool:
+        if priority == PRIORITY_CRITICAL:
+            return True
+        if streaming and self.streaming >= settings.ADMISSION_MAX_STREAMING:
+            return False
+        level = self.load_level()
+        if level == LOAD_OVERLOADED:
+            return False
+        if level == LOAD_BUSY:
+            return priority != PRIORITY_LOW
+        return True
+
+    def start(self):
+        if self._monitor is None:
+            self._monitor = asyncio.create_task(self._watch_loop_lag())
+
+    async def stop(self):
+        if self._monitor is not None:
+            self._monitor.cancel()
+            try:
+                await self._monitor
+            except asyncio.CancelledError:
+                pass
+            self._monitor = None
+
+    # Sleep for a fixed time and measure how late we wake up
+    async def _watch_loop_lag(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(LOOP_LAG_INTERVAL_SECONDS)
+            lag = max(0.0, loop.time() - started - LOOP_LAG_INTERVAL_SECONDS)
+            # React to spikes right away, recover slowly
+            if lag > self.loop_lag:
+                self.loop_lag = lag
+            else:
+                self.loop_lag = self.loop_lag * 0.8 + lag * 0.2
+
+# ASGI middleware that rejects requests with 503 + Retry-After under overload
+class AdmissionMiddleware:
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        priority, streaming = self.controller.rule_for(scope["method"], scope["path"])
+        if not self.controller.admit(priority, streaming):
+            self.controller.rejected[priority] += 1
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Server is busy, please try again shortly"},
+                headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)},
+            )
+            await response(scope, receive, send)
+            return
+
+        if streaming:
+            self.controller.streaming += 1
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                self.controller.streaming -= 1
+            return
+
+        self.controller.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.in_flight -= 1
+
+# Shared controller; priorities are configured next to the routers in app/api/v1/api.py
+admission = AdmissionController()
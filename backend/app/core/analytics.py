@@ -0,0 +1,347 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.core.database import SessionLocal
+
+# Quiz analytics. Attempts are read in columnar batches straight into NumPy
+# arrays and every statistic is kept as running sums, so a cached result is
+# brought up to date by adding the sums of the attempts that arrived since.
+
+# Score histogram bins (percent)
+SCORE_BINS = np.linspace(0, 100, 11)
+
+# --- HELPER FUNCTIONS ---
+
+def snapshot_session() -> Session:
+    """
+    A session whose queries all see the same snapshot, so attempts and their
+    answers can be read with separate queries without a commit in between
+    making them disagree.
+    """
+    db = SessionLocal()
+    db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    return db
+
+def column_batches(db: Session, statement, dtypes: Tuple) -> Iterator[List[np.ndarray]]:
+    """
+    Run a query on a server-side cursor and yield its rows as one array per
+    column, ANALYTICS_BATCH_SIZE rows at a time.
+    """
+    result = db.execute(statement, execution_options={"yield_per": settings.ANALYTICS_BATCH_SIZE})
+    for partition in result.partitions():
+        columns = list(zip(*partition))
+        yield [np.array(column, dtype=dtype) for column, dtype in zip(columns, dtypes)]
+
+# Which attempts a cached result already contains. Attempts are never updated,
+# so everything after the newest one seen is new, except attempts that got
+# their created_at earlier but committed later; those are caught by looking
+# ANALYTICS_SETTLE_SECONDS back and skipping the ids already counted there.
+class Watermark:
+    def __init__(self):
+        self.latest: Optional[datetime] = None
+        self._recent: Dict[uuid.UUID, np.datetime64] = {}
+
+    def apply(self, statement):
+        if self.latest is None:
+            return statement
+        since = self.latest - timedelta(seconds=settings.ANALYTICS_SETTLE_SECONDS)
+        statement = statement.where(models.QuizAttempt.created_at >= since)
+        if self._recent:
+            statement = statement.where(models.QuizAttempt.id.notin_(list(self._recent)))
+        return statement
+
+    def advance(self, ids: np.ndarray, created_at: np.ndarray):
+        known = ~np.isnat(created_at)
+        ids, created_at = ids[known], created_at[known]
+        if not len(ids):
+            return
+        newest = created_at.max()
+        if self.latest is None or newest > np.datetime64(self.latest):
+            self.latest = newest.astype(datetime)
+        since = np.datetime64(self.latest - timedelta(seconds=settings.ANALYTICS_SETTLE_SECONDS))
+        recent = created_at >= since
+        self._recent.update(zip(ids[recent], created_at[recent]))
+        self._recent = {attempt_id: ts for attempt_id, ts in self._recent.items() if ts >= since}
+
+def attempts_statement(quiz_id: Optional[uuid.UUID] = None, department: Optional[str] = None):
+    statement = select(
+        models.QuizAttempt.id, models.QuizAttempt.created_at, models.QuizAttempt.score, models.User.department
+    ).join(models.User, models.User.id == models.QuizAttempt.user_id)
+    if quiz_id is not None:
+        statement = statement.where(models.QuizAttempt.quiz_id == quiz_id)
+    else:
+        # Review sessions mix questions from many quizzes, they are no quiz score
+        statement = statement.where(models.QuizAttempt.quiz_id.is_not(None))
+    if department is not None:
+        statement = statement.where(models.User.department == department)
+    return statement
+
+# --- ITEM STATISTICS ---
+
+class ItemStatistics:
+    """
+    Running sums for the item analysis of one quiz, optionally limited to the
+    attempts of one department. Per question we keep, over the answers given:
+    n, sum(x), sum(r), sum(r^2) and sum(x*r), where x is 1 for a correct answer
+    and r is the rest score (correct answers in the attempt, not counting this
+    one). That is enough for the p-value and the corrected point-biserial
+    correlation, and sums of old and new attempts simply add up.
+    """
+
+    def __init__(self, quiz_id: uuid.UUID, department: Optional[str] = None):
+        self.quiz_id = quiz_id
+        self.department = department
+        self.watermark = Watermark()
+        self.created = time.monotonic()
+        self.updated_at: Optional[datetime] = None
+        self.lock = threading.Lock()
+        self.title = ""
+        self.questions: List[dict] = []
+
+    def load_questions(self, db: Session):
+        quiz = db.get(models.Quiz, self.quiz_id)
+        self.title = quiz.title if quiz else ""
+        questions = db.query(models.QuizQuestion).filter(
+            models.QuizQuestion.quiz_id == self.quiz_id
+        ).order_by(models.QuizQuestion.position).all()
+        self.questions = [
+            {
+                "question_id": question.id,
+                "position": question.position,
+                "text": question.text,
+                "correct_index": question.correct_index,
+                "option_count": len(question.options or []),
+            }
+            for question in questions
+        ]
+
+        count = len(self.questions)
+        self.question_ids = np.array([q["question_id"] for q in self.questions], dtype=np.int64)
+        self._sorter = np.argsort(self.question_ids)
+        self.option_limits = np.array([q["option_count"] for q in self.questions], dtype=np.int64)
+        self.max_options = int(self.option_limits.max()) if count else 0
+
+        self.n = np.zeros(count)
+        self.sum_x = np.zeros(count)
+        self.sum_r = np.zeros(count)
+        self.sum_rr = np.zeros(count)
+        self.sum_xr = np.zeros(count)
+        self.option_counts = np.zeros((count, self.max_options), dtype=np.int64)
+        self.attempt_count = 0
+        self.score_sum = 0.0
+
+    def _question_indexes(self, question_ids: np.ndarray) -> np.ndarray:
+        positions = np.searchsorted(self.question_ids, question_ids, sorter=self._sorter)
+        positions = np.clip(positions, 0, max(len(self.question_ids) - 1, 0))
+        indexes = self._sorter[positions]
+        # -1 for answers to questions that are no longer part of the quiz
+        return np.where(self.question_ids[indexes] == question_ids, indexes, -1)
+
+    def add_answers(self, question_ids: np.ndarray, selected: np.ndarray, correct: np.ndarray, attempt_correct: np.ndarray):
+        if not len(self.questions):
+            return
+        indexes = self._question_indexes(question_ids)
+        known = indexes >= 0
+        indexes, selected = indexes[known], selected[known]
+        x = correct[known].astype(np.float64)
+        rest = attempt_correct[known] - x
+
+        count = len(self.questions)
+        self.n += np.bincount(indexes, minlength=count)
+        self.sum_x += np.bincount(indexes, weights=x, minlength=count)
+        self.sum_r += np.bincount(indexes, weights=rest, minlength=count)
+        self.sum_rr += np.bincount(indexes, weights=rest * rest, minlength=count)
+        self.sum_xr += np.bincount(indexes, weights=x * rest, minlength=count)
+
+        valid = (selected >= 0) & (selected < self.option_limits[indexes])
+        cells = indexes[valid] * self.max_options + selected[valid]
+        self.option_counts += np.bincount(cells, minlength=count * self.max_options).reshape(count, self.max_options)
+
+    def refresh(self, db: Session):
+        """
+        Add the attempts (and their answers) that arrived since the last refresh.
+        db must be a snapshot_session().
+        """
+        if self.updated_at is None:
+            self.load_questions(db)
+
+        attempts = self.watermark.apply(attempts_statement(self.quiz_id, self.department))
+        ids, created, scores = [], [], []
+        for batch_ids, batch_created, batch_scores, _ in column_batches(db, attempts, (object, "datetime64[us]", np.float64, object)):
+            ids.append(batch_ids)
+            created.append(batch_created)
+            scores.append(batch_scores)
+
+        if ids:
+            answers = self.watermark.apply(
+                select(
+                    models.QuizAnswer.question_id,
+                    models.QuizAnswer.selected_index,
+                    models.QuizAnswer.is_correct,
+                    models.QuizAttempt.correct_count,
+                ).join(
+                    models.QuizAttempt, models.QuizAttempt.id == models.QuizAnswer.attempt_id
+                ).join(
+                    models.User, models.User.id == models.QuizAttempt.user_id
+                ).where(models.QuizAttempt.quiz_id == self.quiz_id)
+            )
+            if self.department is not None:
+                answers = answers.where(models.User.department == self.department)
+            for columns in column_batches(db, answers, (np.int64, np.int64, np.bool_, np.float64)):
+                self.add_answers(*columns)
+
+            ids, created, scores = np.concatenate(ids), np.concatenate(created), np.concatenate(scores)
+            self.attempt_count += len(ids)
+            self.score_sum += float(scores.sum())
+            self.watermark.advance(ids, created)
+        self.updated_at = datetime.utcnow()
+
+    def result(self) -> dict:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            p_values = self.sum_x / self.n
+            mean_rest = self.sum_r / self.n
+            variance_x = p_values * (1 - p_values)
+            variance_rest = self.sum_rr / self.n - mean_rest ** 2
+            covariance = self.sum_xr / self.n - p_values * mean_rest
+            point_biserial = covariance / np.sqrt(variance_x * variance_rest)
+        # Undefined when nobody answered, or everybody scored the same
+        point_biserial[~(variance_x * variance_rest > 1e-12)] = np.nan
+
+        items = []
+        for index, question in enumerate(self.questions):
+            items.append({
+                "question_id": question["question_id"],
+                "position": question["position"],
+                "text": question["text"],
+                "correct_index": question["correct_index"],
+                "answered": int(self.n[index]),
+                "p_value": None if np.isnan(p_values[index]) else float(p_values[index]),
+                "point_biserial": None if np.isnan(point_biserial[index]) else float(point_biserial[index]),
+                "option_counts": self.option_counts[index, :question["option_count"]].tolist(),
+            })
+        return {
+            "quiz_id": self.quiz_id,
+            "title": self.title,
+            "department": self.department,
+            "attempt_count": self.attempt_count,
+            "mean_score": self.score_sum / self.attempt_count if self.attempt_count else None,
+            "items": items,
+            "updated_at": self.updated_at,
+        }
+
+# --- SCORE DISTRIBUTIONS ---
+
+class DepartmentScores:
+    """
+    Quiz scores of all attempts, grouped by the department of the user.
+    New attempts are appended to the per-department arrays.
+    """
+
+    def __init__(self):
+        self.watermark = Watermark()
+        self.created = time.monotonic()
+        self.updated_at: Optional[datetime] = None
+        self.lock = threading.Lock()
+        self.scores: Dict[Optional[str], np.ndarray] = {}
+        self._result: Optional[List[dict]] = None
+
+    def refresh(self, db: Session):
+        attempts = self.watermark.apply(attempts_statement())
+        for ids, created, scores, departments in column_batches(db, attempts, (object, "datetime64[us]", np.float64, object)):
+            # Group the batch by department without a Python loop over rows
+            names, groups = np.unique(np.where(np.equal(departments, None), "", departments).astype(str), return_inverse=True)
+            order = np.argsort(groups, kind="stable")
+            bounds = np.searchsorted(groups[order], np.arange(len(names) + 1))
+            for index, name in enumerate(names):
+                department = name or None
+                batch = scores[order[bounds[index]:bounds[index + 1]]]
+                previous = self.scores.get(department)
+                self.scores[department] = batch if previous is None else np.concatenate([previous, batch])
+            self.watermark.advance(ids, created)
+            self._result = None
+        self.updated_at = datetime.utcnow()
+
+    def result(self) -> List[dict]:
+        # Recomputed only after new attempts arrived
+        if self._result is None:
+            self._result = []
+            for department, scores in sorted(self.scores.items(), key=lambda item: item[0] or ""):
+                p25, median, p75 = np.percentile(scores, [25, 50, 75])
+                histogram, _ = np.histogram(np.clip(scores, 0, 100), bins=SCORE_BINS)
+                self._result.append({
+                    "department": department,
+                    "attempt_count": int(len(scores)),
+                    "mean_score": float(scores.mean()),
+                    "std_score": float(scores.std()),
+                    "p25": float(p25),
+                    "median": float(median),
+                    "p75": float(p75),
+                    "histogram": histogram.tolist(),
+                })
+        return self._result
+
+# --- CACHE ---
+
+# In-memory results per quiz (and department) plus the department distributions.
+# A result is brought up to date on every read, which costs one small query
+# when nothing new arrived, and rebuilt from scratch every ANALYTICS_REBUILD_SECONDS.
+class AnalyticsCache:
+    def __init__(self, size: int = settings.ANALYTICS_CACHE_SIZE, rebuild_after: float = settings.ANALYTICS_REBUILD_SECONDS):
+        self.size = size
+        self.rebuild_after = rebuild_after
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[Tuple[uuid.UUID, Optional[str]], ItemStatistics]" = OrderedDict()
+        self._departments: Optional[DepartmentScores] = None
+
+    def _entry(self, key: Tuple[uuid.UUID, Optional[str]]) -> ItemStatistics:
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None or time.monotonic() - entry.created > self.rebuild_after:
+                entry = ItemStatistics(*key)
+                self._items[key] = entry
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+            return entry
+
+    def item_statistics(self, quiz_id: uuid.UUID, department: Optional[str] = None) -> dict:
+        entry = self._entry((quiz_id, department))
+        # One refresh per entry at a time; other entries are not blocked
+        with entry.lock:
+            db = snapshot_session()
+            try:
+                entry.refresh(db)
+            finally:
+                db.close()
+            return entry.result()
+
+    def department_scores(self) -> List[dict]:
+        with self._lock:
+            entry = self._departments
+            if entry is None or time.monotonic() - entry.created > self.rebuild_after:
+                entry = self._departments = DepartmentScores()
+        with entry.lock:
+            db = SessionLocal()
+            try:
+                entry.refresh(db)
+            finally:
+                db.close()
+            return entry.result()
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._departments = None
+
+# Shared cache for the analytics router
+analytics_cache = AnalyticsCache()
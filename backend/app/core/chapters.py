@@ -0,0 +1,180 @@
+import re
+import uuid
+from typing import List, Optional, Tuple
+
+from pypdf import PdfReader
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core import storage, versions
+
+# Lines like "Chapter 3", "UNIT IV: Parliament", "Part 2 - The Union".
+# Roman numerals must be uppercase, or "Part did not go well" would be a chapter.
+CHAPTER_PATTERN = re.compile(r"^(?i:(chapter|unit|part|lesson))\s+([0-9]+|[IVXLCDM]+)\b\s*[.:\-–]?\s*(.*)$")
+# Lines like "3.2 Powers of the President"
+SECTION_PATTERN = re.compile(r"^(\d{1,3})\.(\d{1,3})\s+([A-Z].{2,100})$")
+
+# Headings are expected near the top of a page and are short
+HEADING_LINES = 5
+HEADING_MAX_LENGTH = 100
+
+# (level, title, page number starting at 1)
+Entry = Tuple[int, str, int]
+
+# --- HELPER FUNCTIONS ---
+
+def outline_entries(file_path: str) -> List[Entry]:
+    """
+    Chapters and sections from the PDF bookmarks (first two levels only)
+    """
+    with storage.open_file(file_path) as f:
+        return _outline_entries(PdfReader(f))
+
+def _outline_entries(reader: PdfReader) -> List[Entry]:
+    entries = []
+
+    def walk(items, level):
+        for item in items:
+            if isinstance(item, list):
+                # A nested list holds the children of the item before it
+                if level < 2:
+                    walk(item, level + 1)
+                continue
+            try:
+                page_index = reader.get_destination_page_number(item)
+            except Exception:
+                continue
+            if page_index is not None and page_index >= 0 and item.title:
+                entries.append((level, item.title.strip(), page_index + 1))
+
+    try:
+        walk(reader.outline, 1)
+    except Exception as e:
+        print(f"Could not read PDF outline: {e}")
+        return []
+    return entries
+
+def heading_entries(page_texts: List[str]) -> List[Entry]:
+    """
+    Chapters and sections guessed from heading-like lines at the top of each page
+    """
+    entries = []
+    for page_number, text in enumerate(page_texts, start=1):
+        lines = [line.strip() for line in text.splitlines() if line.strip()][:HEADING_LINES]
+        for index, line in enumerate(lines):
+            if len(line) > HEADING_MAX_LENGTH:
+                continue
+            match = CHAPTER_PATTERN.match(line)
+            if match:
+                title = line
+                # "Chapter 3" alone is usually followed by the real title on the next line
+                if not match.group(3) and index + 1 < len(lines):
+                    title = f"{line}: {lines[index + 1]}"
+                entries.append((1, title, page_number))
+                break
+            if SECTION_PATTERN.match(line):
+                entries.append((2, line, page_number))
+                break
+    return entries
+
+def build_ranges(entries: List[Entry], page_count: int) -> List[dict]:
+    """
+    Give every entry an end page: the page before the next entry of the same
+    or a higher level starts, or the last page of the document.
+    """
+    entries = sorted(entries, key=lambda entry: entry[2])
+    # Running headers repeat the same heading on every page; keep the first one
+    unique = []
+    for entry in entries:
+        if unique and unique[-1][0] == entry[0] and unique[-1][1].lower() == entry[1].lower():
+            continue
+        unique.append(entry)
+
+    chapters = []
+    for index, (level, title, start_page) in enumerate(unique):
+        end_page = page_count
+        for next_level, _, next_start in unique[index + 1:]:
+            if next_level <= level:
+                end_page = max(start_page, next_start - 1)
+                break
+        chapters.append({
+            "level": level,
+            "title": title[:255],
+            "start_page": start_page,
+            "end_page": min(end_page, page_count),
+        })
+    return chapters
+
+def _match_key(level: int, title: str) -> Tuple[int, str]:
+    return level, title.strip().lower()
+
+# --- PUBLIC FUNCTIONS ---
+
+def segment(db: Session, doc: models.Document, version: models.DocumentVersion, page_texts: List[str]) -> List[models.Chapter]:
+    """
+    Detect chapters of a version and store them, replacing earlier results for
+    the same version. Uses the PDF outline when there is one, headings otherwise.
+    A chapter with the same level and title as one of the previous version (or
+    an earlier run on this version) keeps its id, so quizzes and summaries made
+    for it stay linked. The caller commits.
+    """
+    page_count = version.page_count or len(page_texts)
+    source = "outline"
+    entries = outline_entries(version.file_path) if (doc.file_type or "").lower() == "pdf" else []
+    entries = [entry for entry in entries if entry[2] <= page_count]
+    if not entries:
+        source = "heading"
+        entries = heading_entries(page_texts)
+
+    # Rows of this version first, then those of the latest earlier version with chapters
+    previous_version = db.query(models.Chapter.version).filter(
+        models.Chapter.document_id == doc.id,
+        models.Chapter.version < version.version
+    ).order_by(models.Chapter.version.desc()).limit(1).scalar()
+    existing = db.query(models.Chapter).filter(
+        models.Chapter.document_id == doc.id,
+        models.Chapter.version.in_([version.version, previous_version])
+    ).order_by(models.Chapter.version.desc(), models.Chapter.position).all()
+    reusable = {}
+    for chapter in existing:
+        reusable.setdefault(_match_key(chapter.level, chapter.title), []).append(chapter)
+
+    chapters = []
+    for position, values in enumerate(build_ranges(entries, page_count), start=1):
+        matches = reusable.get(_match_key(values["level"], values["title"]))
+        if matches:
+            # Moved to this version; the earlier version simply loses the row
+            chapter = matches.pop(0)
+            chapter.version = version.version
+            chapter.position = position
+            chapter.source = source
+            for key, value in values.items():
+                setattr(chapter, key, value)
+        else:
+            chapter = models.Chapter(document_id=doc.id, version=version.version, position=position, source=source, **values)
+            db.add(chapter)
+        chapters.append(chapter)
+
+    # Chapters of this version that were not detected again
+    kept = {chapter.id for chapter in chapters}
+    for chapter in existing:
+        if chapter.version == version.version and chapter.id not in kept:
+            db.delete(chapter)
+    return chapters
+
+def get_chapter(db: Session, document_id: uuid.UUID, chapter_id: uuid.UUID) -> Optional[models.Chapter]:
+    return db.query(models.Chapter).filter(
+        models.Chapter.id == chapter_id,
+        models.Chapter.document_id == document_id
+    ).first()
+
+def source_text(db: Session, doc: models.Document, chapter: Optional[models.Chapter] = None) -> str:
+    """
+    The text generation works on: only the chapter's pages when a chapter is
+    given, otherwise the whole current version.
+    """
+    if chapter is None:
+        pages = versions.version_text(db, doc.id, doc.current_version)
+    else:
+        pages = versions.version_text(db, doc.id, chapter.version, chapter.start_page, chapter.end_page)
+    return "\n".join(pages)
@@ -5,7 +5,9 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "LokAI"
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str = "YOUR_SECRET_KEY"  # TODO: Change in production
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15  # Short-lived; clients get new ones with the refresh token
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    PASSWORD_RESET_TOKEN_EXPIRE_MINUTES: int = 15
     
     # Database
     POSTGRES_SERVER: str = "localhost"
@@ -14,6 +16,47 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = "lokai"
     SQLALCHEMY_DATABASE_URI: Optional[str] = None
 
+    # Resumable uploads
+    UPLOAD_SESSION_DIR: str = "upload_sessions"  # Kept outside "uploads" so partial files are never served
+    UPLOAD_SESSION_EXPIRE_MINUTES: int = 60 * 24
+    UPLOAD_MAX_SIZE: int = 1024 * 1024 * 1024  # 1 GB, documents.size is a 32-bit column
+
+    # Activity feed: events are buffered in memory and written in batches
+    ACTIVITY_FLUSH_SIZE: int = 200  # Flush as soon as this many events are waiting
+    ACTIVITY_FLUSH_INTERVAL_SECONDS: float = 5.0  # ... or after this much time
+    ACTIVITY_BUFFER_MAX: int = 10000  # Drop the oldest events if the database is unreachable for long
+
+    # Admission control: "busy" limits shed low priority work, "max" limits shed everything but critical
+    ADMISSION_BUSY_IN_FLIGHT: int = 64
+    ADMISSION_MAX_IN_FLIGHT: int = 256
+    ADMISSION_BUSY_THREADPOOL_WAITING: int = 1  # Requests waiting for a worker thread
+    ADMISSION_MAX_THREADPOOL_WAITING: int = 64
+    ADMISSION_BUSY_LOOP_LAG_MS: float = 100.0
+    ADMISSION_MAX_LOOP_LAG_MS: float = 500.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 5
+    ADMISSION_MAX_STREAMING: int = 512  # Downloads, exports and upload chunks, not counted as in flight
+
+    # Storage tiers: files of documents nobody opened for a while are compressed in the background
+    STORAGE_COLD_AFTER_DAYS: int = 30
+    STORAGE_COMPACT_INTERVAL_SECONDS: float = 60 * 60
+    STORAGE_COMPACT_BATCH_SIZE: int = 50
+    STORAGE_COMPRESSION_LEVEL: int = 10  # zstd level; compression runs in the background, reads don't depend on it
+    STORAGE_FRAME_SIZE: int = 1024 * 1024  # Bytes per independently readable frame; smaller = cheaper range reads, worse ratio
+    STORAGE_MIN_SAVINGS: float = 0.1  # Keep files raw unless compression saves at least this fraction
+    STORAGE_TOUCH_INTERVAL_MINUTES: int = 60  # How often last_accessed_at is written for a document being read
+    STORAGE_CLAIM_TIMEOUT_MINUTES: int = 60  # A document still "compressing" after this long was left by a dead worker
+
+    # Token revocation: every process keeps a Bloom filter of revoked tokens and users in memory
+    REVOCATION_SYNC_INTERVAL_SECONDS: float = 30.0  # Revocations made by other processes apply after at most this long
+    REVOCATION_FALSE_POSITIVE_RATE: float = 0.001  # Share of valid tokens that still need a database lookup
+    REVOCATION_MIN_CAPACITY: int = 1024
+
+    # Quiz analytics: results are cached in memory and updated with new attempts only
+    ANALYTICS_BATCH_SIZE: int = 10000  # Rows per columnar batch
+    ANALYTICS_CACHE_SIZE: int = 256  # Quizzes (per department) kept in memory
+    ANALYTICS_REBUILD_SECONDS: float = 60 * 60  # Recompute from scratch after this long, to drop deleted attempts and follow department changes
+    ANALYTICS_SETTLE_SECONDS: float = 60.0  # Attempts this close to the newest one seen are checked again, in case they committed late
+
     class Config:
         case_sensitive = True
 
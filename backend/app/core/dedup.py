@@ -0,0 +1,137 @@
+import hashlib
+import re
+import uuid
+import zlib
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+
+from app import models
+
+# MinHash / LSH settings. With 16 bands of 8 rows, two documents become
+# candidates with ~50% chance at a Jaccard similarity of 0.7 and almost
+# certainly above 0.8; candidates are then checked against SIMILARITY_THRESHOLD.
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5 # Words per shingle
+SIMILARITY_THRESHOLD = 0.8
+
+# Shingles are hashed in chunks so a 300 MB textbook doesn't need a huge matrix
+HASH_CHUNK_SIZE = 8192
+
+# Random multiply-shift hash functions h(x) = (a * x + b) >> 32 over uint64.
+# A fixed seed keeps signatures comparable between processes and restarts.
+_rng = np.random.default_rng(20260107)
+_A = _rng.integers(1, np.iinfo(np.uint64).max, size=NUM_PERM, dtype=np.uint64, endpoint=True) | np.uint64(1)
+_B = _rng.integers(0, np.iinfo(np.uint64).max, size=NUM_PERM, dtype=np.uint64, endpoint=True)
+_SHIFT = np.uint64(32)
+
+SIGNATURE_DTYPE = np.dtype("<u4")
+
+# --- HELPER FUNCTIONS ---
+
+def shingle_hashes(text: str) -> np.ndarray:
+    words = re.findall(r"\w+", text.lower())
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    if len(words) < SHINGLE_SIZE:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    return np.fromiter(
+        (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+
+def minhash_signature(hashes: np.ndarray) -> np.ndarray:
+    signature = np.full(NUM_PERM, np.iinfo(np.uint32).max, dtype=np.uint64)
+    for start in range(0, len(hashes), HASH_CHUNK_SIZE):
+        chunk = hashes[start:start + HASH_CHUNK_SIZE]
+        # (NUM_PERM, chunk) matrix; uint64 arithmetic wraps around, which is what we want
+        permuted = (_A[:, None] * chunk[None, :] + _B[:, None]) >> _SHIFT
+        np.minimum(signature, permuted.min(axis=1), out=signature)
+    return signature.astype(SIGNATURE_DTYPE)
+
+def band_hashes(signature: np.ndarray) -> List[Tuple[int, int]]:
+    result = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS].astype(SIGNATURE_DTYPE).tobytes()
+        digest = hashlib.blake2b(rows, digest_size=8).digest()
+        result.append((band, int.from_bytes(digest, "big", signed=True)))
+    return result
+
+# Estimated Jaccard similarity of one signature against many, in one NumPy operation
+def similarities(signature: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+    return (candidates == signature[None, :]).mean(axis=1)
+
+# --- PUBLIC FUNCTIONS ---
+
+def index_document(db: Session, doc: models.Document, text: str) -> Optional[models.Document]:
+    """
+    Store the MinHash signature and LSH buckets of a document and flag it when
+    it is a near-duplicate of an existing document of the same user.
+    Returns the document it duplicates, if any. The caller commits.
+    """
+    # Re-indexing (e.g. a new version) replaces whatever we stored before
+    doc.duplicate_of_id = None
+    doc.duplicate_similarity = None
+    db.query(models.LshBucket).filter(models.LshBucket.document_id == doc.id).delete()
+    db.query(models.DocumentSignature).filter(models.DocumentSignature.document_id == doc.id).delete()
+
+    hashes = shingle_hashes(text)
+    if len(hashes) == 0:
+        # Nothing to compare (e.g. a scanned PDF without a text layer)
+        return None
+    signature = minhash_signature(hashes)
+    buckets = band_hashes(signature)
+
+    db.add(models.DocumentSignature(
+        document_id=doc.id,
+        signature=signature.tobytes(),
+        shingle_count=len(hashes),
+    ))
+
+    candidate_ids = [
+        document_id for (document_id,) in db.query(models.LshBucket.document_id).filter(
+            models.LshBucket.user_id == doc.user_id,
+            tuple_(models.LshBucket.band, models.LshBucket.bucket_hash).in_(buckets),
+            models.LshBucket.document_id != doc.id,
+        ).distinct()
+    ]
+
+    db.add_all(
+        models.LshBucket(user_id=doc.user_id, band=band, bucket_hash=bucket_hash, document_id=doc.id)
+        for band, bucket_hash in buckets
+    )
+
+    if not candidate_ids:
+        return None
+
+    rows = db.query(models.DocumentSignature.document_id, models.DocumentSignature.signature).filter(
+        models.DocumentSignature.document_id.in_(candidate_ids)
+    ).all()
+    matrix = np.frombuffer(b"".join(row.signature for row in rows), dtype=SIGNATURE_DTYPE).reshape(len(rows), NUM_PERM)
+    scores = similarities(signature, matrix)
+
+    best = int(np.argmax(scores))
+    if scores[best] < SIMILARITY_THRESHOLD:
+        return None
+
+    original = db.get(models.Document, rows[best].document_id)
+    # Always point at the first document of a cluster so clusters don't form chains
+    if original.duplicate_of_id is not None:
+        original = db.get(models.Document, original.duplicate_of_id) or original
+    doc.duplicate_of_id = original.id
+    doc.duplicate_similarity = float(scores[best])
+    return original
+
+# The document whose generated results can be reused for this one
+def canonical_document_id(db: Session, document_id: uuid.UUID) -> uuid.UUID:
+    duplicate_of_id = db.query(models.Document.duplicate_of_id).filter(
+        models.Document.id == document_id
+    ).scalar()
+    return duplicate_of_id or document_id
@@ -0,0 +1,106 @@
+import hashlib
+import io
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import docx
+from pypdf import PdfReader
+from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
+
+from app.core import storage
+
+# Files are read through the storage layer, so compressed (cold) files work too
+
+# --- HELPER FUNCTIONS ---
+
+def _read_text_pages(file_path: str, file_type: str) -> List[str]:
+    if file_type == "docx":
+        # Word files have no fixed pages, so the whole text counts as one page
+        with storage.open_file(file_path) as f:
+            document = docx.Document(f)
+        return ["\n".join(paragraph.text for paragraph in document.paragraphs)]
+    if file_type in ("txt", "md"):
+        with io.TextIOWrapper(storage.open_file(file_path), encoding="utf-8", errors="replace") as f:
+            # Form feeds are the usual page break in plain text exports
+            return f.read().split("\f")
+    return []
+
+def _hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+# Keys that point back up the page tree rather than at what the page draws
+_SKIPPED_KEYS = {"/Parent", "/P"}
+
+def _object_digest(obj: Any, cache: Dict[Tuple[int, int], bytes]) -> bytes:
+    """
+    Digest of a PDF object and everything it references (form XObjects,
+    images, fonts...). Indirect objects are hashed once per file, which also
+    stops reference cycles.
+    """
+    if isinstance(obj, IndirectObject):
+        key = (obj.idnum, obj.generation)
+        if key not in cache:
+            cache[key] = b""
+            cache[key] = _object_digest(obj.get_object(), cache)
+        return cache[key]
+
+    digest = hashlib.sha256(type(obj).__name__.encode("ascii"))
+    if isinstance(obj, DictionaryObject):
+        for key in sorted(obj):
+            if key not in _SKIPPED_KEYS:
+                digest.update(key.encode("utf-8"))
+                digest.update(_object_digest(obj.raw_get(key), cache))
+        if isinstance(obj, StreamObject):
+            try:
+                digest.update(obj.get_data())
+            except Exception:
+                # Filters pypdf can't decode (e.g. some image codecs): the encoded bytes will do
+                digest.update(obj._data)
+    elif isinstance(obj, ArrayObject):
+        for item in obj:
+            digest.update(_object_digest(item, cache))
+    else:
+        digest.update(repr(obj).encode("utf-8"))
+    return digest.digest()
+
+# --- PUBLIC FUNCTIONS ---
+
+def fingerprint_pages(file_path: str, file_type: str) -> List[str]:
+    """
+    Content hash of every page. For PDFs we hash the page content stream and
+    the resources it draws, which is much cheaper than extracting the text.
+    The resources matter: two pages can have the same "/Fm0 Do" content
+    stream and show different forms or images.
+    """
+    file_type = (file_type or "").lower()
+    if file_type == "pdf":
+        hashes = []
+        # Resources shared between pages (fonts, logos) are only hashed once
+        cache: Dict[Tuple[int, int], bytes] = {}
+        with storage.open_file(file_path) as f:
+            for page in PdfReader(f).pages:
+                contents = page.get_contents()
+                resources = page.raw_get("/Resources") if "/Resources" in page else None
+                hashes.append(_hash(
+                    (contents.get_data() if contents is not None else b"")
+                    + _object_digest(resources, cache)
+                ))
+        return hashes
+    return [_hash(text.encode("utf-8")) for text in _read_text_pages(file_path, file_type)]
+
+def extract_pages(
+    file_path: str, file_type: str, page_indexes: Optional[Iterable[int]] = None
+) -> Dict[int, str]:
+    """
+    Extract the text of the given pages (0-based indexes, all pages if None).
+    File types we can't read return nothing, so later stages just skip them.
+    """
+    file_type = (file_type or "").lower()
+    if file_type == "pdf":
+        with storage.open_file(file_path) as f:
+            pages = PdfReader(f).pages
+            indexes = range(len(pages)) if page_indexes is None else page_indexes
+            return {i: pages[i].extract_text() or "" for i in indexes}
+
+    texts = _read_text_pages(file_path, file_type)
+    indexes = range(len(texts)) if page_indexes is None else page_indexes
+    return {i: texts[i] for i in indexes}
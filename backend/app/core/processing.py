@@ -0,0 +1,43 @@
+import uuid
+
+from app import models
+from app.core import chapters, dedup, stats, versions
+from app.core.database import SessionLocal
+
+# Background processing that runs after a document (or a new version of it) is uploaded.
+# It opens its own session because the request's session is closed by then.
+def process_document(document_id: uuid.UUID):
+    db = SessionLocal()
+    try:
+        doc = db.get(models.Document, document_id)
+        if doc is None:
+            return
+        version = versions.get_version(db, doc.id, doc.current_version)
+        if version is None:
+            # Documents from before versioning: their file becomes version 1
+            version = versions.add_version(db, doc, doc.filename, doc.file_path, doc.size)
+
+        # Only pages with new content are extracted; unchanged pages keep their text
+        versions.sync_pages(db, doc, version)
+
+        page_texts = versions.version_text(db, doc.id, version.version)
+
+        # Chapter boundaries, so generation can work on one chapter at a time
+        chapters.segment(db, doc, version, page_texts)
+
+        text = "\n".join(page_texts)
+
+        # Flag near-duplicates so their summaries and quizzes can be reused
+        dedup.index_document(db, doc, text)
+
+        stats.set_document_status(db, doc, "Analyzed")
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Error processing document {document_id}: {e}")
+        doc = db.get(models.Document, document_id)
+        if doc is not None:
+            stats.set_document_status(db, doc, "Error")
+            db.commit()
+    finally:
+        db.close()
@@ -0,0 +1,172 @@
+import hashlib
+import math
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.core.database import SessionLocal
+
+# Bloom filter over strings. It can say "maybe present" for something that was
+# never added (at about the configured rate), but never "absent" for something
+# that was, so a miss is a safe answer without asking the database.
+class BloomFilter:
+    def __init__(self, capacity: int, false_positive_rate: float):
+        capacity = max(1, capacity)
+        self.size = max(8, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> Iterable[int]:
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+def token_key(jti: str) -> str:
+    return f"jti:{jti}"
+
+def user_key(user_id: str) -> str:
+    return f"user:{user_id}"
+
+# Revoked access tokens and users whose earlier tokens were all revoked, kept
+# in memory as a Bloom filter that a background thread rebuilds from the
+# database every REVOCATION_SYNC_INTERVAL_SECONDS. Checking a token normally
+# costs no query at all; only filter hits are looked up exactly.
+# Revocations made by this process are added to the filter right away, those
+# made by other processes show up after the next sync.
+class RevocationList:
+    def __init__(
+        self,
+        sync_interval: float = settings.REVOCATION_SYNC_INTERVAL_SECONDS,
+        false_positive_rate: float = settings.REVOCATION_FALSE_POSITIVE_RATE,
+        min_capacity: int = settings.REVOCATION_MIN_CAPACITY,
+    ):
+        self.sync_interval = sync_interval
+        self.false_positive_rate = false_positive_rate
+        self.min_capacity = min_capacity
+
+        self._lock = threading.Lock()
+        # None until the first sync worked; until then every token is checked in the database
+        self._filter: Optional[BloomFilter] = None
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self.sync()
+        self._thread = threading.Thread(target=self._run, name="revocation-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        self._thread.join()
+        self._thread = None
+
+    def sync(self) -> bool:
+        """
+        Rebuild the filter from the database and drop rows that expired.
+        Keeps the old filter if the database can't be reached.
+        """
+        now = datetime.utcnow()
+        # A reset older than the longest access token lifetime can't match a token that is still valid
+        reset_cutoff = now - timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        db = SessionLocal()
+        try:
+            db.query(models.RevokedToken).filter(models.RevokedToken.expires_at < now).delete()
+            db.query(models.RefreshToken).filter(models.RefreshToken.expires_at < now).delete()
+            db.commit()
+
+            keys = [
+                token_key(str(jti)) for (jti,) in db.query(models.RevokedToken.jti)
+            ]
+            keys.extend(
+                user_key(str(user_id)) for (user_id,) in db.query(models.User.id).filter(
+                    models.User.tokens_valid_after > reset_cutoff
+                )
+            )
+        except Exception as e:
+            db.rollback()
+            print(f"Error syncing token revocations: {e}")
+            return False
+        finally:
+            db.close()
+
+        # Room to spare for revocations added before the next sync
+        bloom = BloomFilter(max(self.min_capacity, 2 * len(keys)), self.false_positive_rate)
+        for key in keys:
+            bloom.add(key)
+        with self._lock:
+            self._filter = bloom
+        return True
+
+    def might_be_revoked(self, jti: str, user_id: str) -> bool:
+        bloom = self._filter
+        if bloom is None:
+            return True
+        return token_key(jti) in bloom or user_key(user_id) in bloom
+
+    def is_revoked(self, db: Session, jti: str, user_id: str, issued_at: datetime) -> bool:
+        """
+        Exact check in the database, for tokens the filter might know
+        """
+        if db.get(models.RevokedToken, uuid.UUID(jti)) is not None:
+            return True
+        user = db.get(models.User, uuid.UUID(user_id))
+        if user is None or not user.is_active:
+            return True
+        return user.tokens_valid_after is not None and issued_at < user.tokens_valid_after
+
+    def _add(self, key: str):
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(key)
+
+    def revoke_token(self, db: Session, jti: str, user_id: uuid.UUID, expires_at: datetime):
+        """
+        Revoke one access token. The caller commits.
+        """
+        db.merge(models.RevokedToken(jti=uuid.UUID(jti), user_id=user_id, expires_at=expires_at))
+        self._add(token_key(jti))
+
+    def revoke_user(self, db: Session, user: models.User):
+        """
+        Revoke every token issued to a user until now, refresh tokens included.
+        The caller commits.
+        """
+        now = datetime.utcnow()
+        user.tokens_valid_after = now
+        db.query(models.RefreshToken).filter(
+            models.RefreshToken.user_id == user.id,
+            models.RefreshToken.revoked_at.is_(None)
+        ).update({"revoked_at": now}, synchronize_session=False)
+        self._add(user_key(str(user.id)))
+
+    def _run(self):
+        while not self._stopping:
+            self._wakeup.wait(self.sync_interval)
+            self._wakeup.clear()
+            if self._stopping:
+                break
+            self.sync()
+
+# Shared revocation list, started and stopped together with the app (see app/main.py)
+revocations = RevocationList()
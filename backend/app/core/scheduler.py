@@ -0,0 +1,147 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core import stats
+
+# SM-2 defaults
+DEFAULT_EASINESS = 2.5
+MIN_EASINESS = 1.3
+
+# Recall quality (0-5) used when the client doesn't rate an answer itself
+QUALITY_CORRECT = 4
+QUALITY_WRONG = 1
+
+def sm2(repetitions: int, interval_days: int, easiness: float, quality: int) -> Tuple[int, int, float]:
+    """
+    One SM-2 step. Returns the new (repetitions, interval in days, easiness).
+    """
+    if quality >= 3:
+        if repetitions == 0:
+            interval_days = 1
+        elif repetitions == 1:
+            interval_days = 6
+        else:
+            interval_days = max(1, round(interval_days * easiness))
+        repetitions += 1
+    else:
+        # Forgotten: start over, but keep the (lowered) easiness
+        repetitions = 0
+        interval_days = 1
+    easiness = easiness + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+    return repetitions, interval_days, max(MIN_EASINESS, easiness)
+
+def grade_attempt(
+    db: Session,
+    user_id: uuid.UUID,
+    questions: Dict[int, models.QuizQuestion],
+    answers: List[dict],
+    quiz_id: Optional[uuid.UUID] = None,
+) -> Tuple[models.QuizAttempt, List[dict]]:
+    """
+    Grade answers ({question_id, selected_index, quality?}) and store the attempt,
+    its answers and the new review states with one bulk statement each.
+    questions must contain every answered question. The caller commits.
+    """
+    now = datetime.utcnow()
+
+    # Current review states of all answered questions in one query, locked
+    # so two attempts at the same time don't overwrite each other
+    current = {
+        state.question_id: (state.repetitions, state.interval_days, state.easiness)
+        for state in db.query(models.ReviewState).filter(
+            models.ReviewState.user_id == user_id,
+            models.ReviewState.question_id.in_([answer["question_id"] for answer in answers])
+        ).with_for_update()
+    }
+
+    results = []
+    state_rows = {}
+    for answer in answers:
+        question = questions[answer["question_id"]]
+        is_correct = answer["selected_index"] == question.correct_index
+        quality = answer.get("quality")
+        if quality is None:
+            quality = QUALITY_CORRECT if is_correct else QUALITY_WRONG
+        elif not is_correct:
+            # A wrong answer can't count as remembered, whatever the self-rating says
+            quality = min(quality, 2)
+
+        # If the same question is answered twice, the steps are chained
+        repetitions, interval_days, easiness = sm2(
+            *current.get(question.id, (0, 0, DEFAULT_EASINESS)), quality
+        )
+        current[question.id] = (repetitions, interval_days, easiness)
+
+        state_rows[question.id] = {
+            "user_id": user_id,
+            "question_id": question.id,
+            "repetitions": repetitions,
+            "interval_days": interval_days,
+            "easiness": easiness,
+            "due_at": now + timedelta(days=interval_days),
+            "last_reviewed_at": now,
+        }
+        results.append({
+            "question_id": question.id,
+            "selected_index": answer["selected_index"],
+            "correct_index": question.correct_index,
+            "is_correct": is_correct,
+            "quality": quality,
+            "due_at": state_rows[question.id]["due_at"],
+        })
+
+    correct_count = sum(1 for result in results if result["is_correct"])
+    attempt = models.QuizAttempt(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        quiz_id=quiz_id,
+        correct_count=correct_count,
+        total_count=len(results),
+        score=100.0 * correct_count / len(results) if results else 0.0,
+        created_at=now,
+    )
+    db.add(attempt)
+    db.flush()
+
+    if results:
+        db.execute(insert(models.QuizAnswer), [
+            {
+                "attempt_id": attempt.id,
+                "question_id": result["question_id"],
+                "selected_index": result["selected_index"],
+                "is_correct": result["is_correct"],
+                "quality": result["quality"],
+            }
+            for result in results
+        ])
+        statement = pg_insert(models.ReviewState).values(list(state_rows.values()))
+        statement = statement.on_conflict_do_update(
+            index_elements=["user_id", "question_id"],
+            set_={
+                column: statement.excluded[column]
+                for column in ("repetitions", "interval_days", "easiness", "due_at", "last_reviewed_at")
+            },
+        )
+        db.execute(statement)
+
+    # Review sessions don't count as taking a quiz on the dashboard
+    if quiz_id is not None:
+        stats.quiz_completed(db, user_id, attempt.score)
+
+    return attempt, results
+
+# The next due questions of a user, served by the (user_id, due_at) index
+def due_questions(db: Session, user_id: uuid.UUID, limit: int, until: Optional[datetime] = None) -> List[Tuple[models.ReviewState, models.QuizQuestion]]:
+    until = until or datetime.utcnow()
+    return db.query(models.ReviewState, models.QuizQuestion).join(
+        models.QuizQuestion, models.QuizQuestion.id == models.ReviewState.question_id
+    ).filter(
+        models.ReviewState.user_id == user_id,
+        models.ReviewState.due_at <= until
+    ).order_by(models.ReviewState.due_at).limit(limit).all()
@@ -1,5 +1,6 @@
-from datetime import datetime, timedelta
-from typing import Any, Union
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional, Union
 from jose import jwt
 from passlib.context import CryptContext
 from app.core.config import settings
@@ -8,15 +9,40 @@ pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
 ALGORITHM = "HS256"
 
-def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    
-    to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+# Every token says what it is for, so e.g. a reset token can't be used as an access token
+TOKEN_TYPE_ACCESS = "access"
+TOKEN_TYPE_REFRESH = "refresh"
+TOKEN_TYPE_RESET = "reset"
+
+def create_token(
+    subject: Union[str, Any],
+    token_type: str,
+    expires_delta: timedelta,
+    token_id: Optional[uuid.UUID] = None,
+    claims: Optional[dict] = None,
+) -> str:
+    now = datetime.utcnow()
+    to_encode = {
+        "sub": str(subject),
+        "type": token_type,
+        "jti": str(token_id or uuid.uuid4()),
+        # Not rounded to whole seconds, so a token issued right after a password
+        # reset is not mistaken for one issued before it
+        "iat": now.replace(tzinfo=timezone.utc).timestamp(),
+        "exp": now + expires_delta,
+        **(claims or {}),
+    }
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
+
+def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None, claims: Optional[dict] = None) -> str:
+    if not expires_delta:
+        expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    return create_token(subject, TOKEN_TYPE_ACCESS, expires_delta, claims=claims)
+
+def create_refresh_token(subject: Union[str, Any], token_id: uuid.UUID) -> str:
+    return create_token(
+        subject, TOKEN_TYPE_REFRESH, timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS), token_id=token_id
+    )
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -24,12 +50,19 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
-def verify_token(token: str, credential_exception) -> str:
+# Decode a token of the given type. Raises jwt.JWTError if it is invalid, expired or of another type.
+def decode_token(token: str, token_type: str) -> dict:
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+    if payload.get("type") != token_type or payload.get("sub") is None or payload.get("jti") is None:
+        raise jwt.JWTError("Wrong token type")
+    return payload
+
+# When a token was issued, as a naive UTC datetime like the rest of the database
+def issued_at(payload: dict) -> datetime:
+    return datetime.utcfromtimestamp(payload.get("iat", 0))
+
+def verify_token(token: str, credential_exception, token_type: str = TOKEN_TYPE_RESET) -> dict:
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credential_exception
-        return email
+        return decode_token(token, token_type)
     except jwt.JWTError:
         raise credential_exception
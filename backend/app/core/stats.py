@@ -0,0 +1,177 @@
+import uuid
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import DateTime, func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app import models
+
+# Which counter column belongs to which document status
+STATUS_COLUMNS = {
+    "Processing": "documents_processing",
+    "Analyzed": "documents_analyzed",
+    "Error": "documents_error",
+}
+
+# Columns that reconcile_user_stats rebuilds from the source tables
+RECONCILED_COLUMNS = [
+    "documents_total",
+    "documents_processing",
+    "documents_analyzed",
+    "documents_error",
+    "total_bytes",
+    "quizzes_taken",
+    "quiz_score_sum",
+    "updated_at",
+]
+
+RECONCILE_BATCH_SIZE = 1000
+
+# Add the given deltas to a user's counters. The caller commits, so the counters
+# change in the same transaction as the rows they describe.
+def apply_delta(db: Session, user_id: uuid.UUID, **deltas):
+    deltas = {column: delta for column, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    # Make sure the row exists, then increment in SQL so parallel requests don't lose updates
+    db.execute(
+        insert(models.UserStats)
+        .values(user_id=user_id)
+        .on_conflict_do_nothing(index_elements=["user_id"])
+    )
+    values = {
+        column: getattr(models.UserStats, column) + delta
+        for column, delta in deltas.items()
+    }
+    values["updated_at"] = datetime.utcnow()
+    db.execute(
+        update(models.UserStats)
+        .where(models.UserStats.user_id == user_id)
+        .values(**values)
+    )
+
+def _status_delta(status: Optional[str], delta: int) -> dict:
+    column = STATUS_COLUMNS.get(status)
+    return {column: delta} if column else {}
+
+def document_added(db: Session, doc: models.Document):
+    apply_delta(
+        db, doc.user_id,
+        documents_total=1,
+        total_bytes=doc.size,
+        **_status_delta(doc.status, 1)
+    )
+
+def document_removed(db: Session, doc: models.Document):
+    apply_delta(
+        db, doc.user_id,
+        documents_total=-1,
+        total_bytes=-doc.size,
+        **_status_delta(doc.status, -1)
+    )
+
+# Change a document's status and move it to the right counter
+def set_document_status(db: Session, doc: models.Document, status: str):
+    if doc.status == status:
+        return
+    deltas = _status_delta(doc.status, -1)
+    for column, delta in _status_delta(status, 1).items():
+        deltas[column] = deltas.get(column, 0) + delta
+    apply_delta(db, doc.user_id, **deltas)
+    doc.status = status
+    if status in ("Analyzed", "Error"):
+        doc.processed_at = datetime.utcnow()
+
+# score is a percentage (0-100)
+def quiz_completed(db: Session, user_id: uuid.UUID, score: float):
+    apply_delta(db, user_id, quizzes_taken=1, quiz_score_sum=score)
+
+def get_user_stats(db: Session, user_id: uuid.UUID) -> dict:
+    stats = db.get(models.UserStats, user_id)
+    if stats is None:
+        return {}
+    return {
+        "documents_total": stats.documents_total,
+        "documents_processing": stats.documents_processing,
+        "documents_analyzed": stats.documents_analyzed,
+        "documents_error": stats.documents_error,
+        "total_bytes": stats.total_bytes,
+        "quizzes_taken": stats.quizzes_taken,
+        "average_score": stats.quiz_score_sum / stats.quizzes_taken if stats.quizzes_taken else 0.0,
+    }
+
+def _rebuilt_counters(user_ids: List[uuid.UUID]):
+    """
+    SELECT of (user_id, *RECONCILED_COLUMNS) computed from the source tables
+    """
+    documents = select(
+        models.Document.user_id,
+        func.count(models.Document.id).label("documents_total"),
+        *[
+            func.count(models.Document.id).filter(models.Document.status == status).label(column)
+            for status, column in STATUS_COLUMNS.items()
+        ],
+        func.sum(models.Document.size).label("total_bytes"),
+    ).where(models.Document.user_id.in_(user_ids)).group_by(models.Document.user_id).subquery()
+
+    # Review sessions have no quiz and don't count as quizzes taken
+    attempts = select(
+        models.QuizAttempt.user_id,
+        func.count(models.QuizAttempt.id).label("quizzes_taken"),
+        func.sum(models.QuizAttempt.score).label("quiz_score_sum"),
+    ).where(
+        models.QuizAttempt.quiz_id.isnot(None),
+        models.QuizAttempt.user_id.in_(user_ids)
+    ).group_by(models.QuizAttempt.user_id).subquery()
+
+    return select(
+        models.User.id,
+        func.coalesce(documents.c.documents_total, 0),
+        *[func.coalesce(documents.c[column], 0) for column in STATUS_COLUMNS.values()],
+        func.coalesce(documents.c.total_bytes, 0),
+        func.coalesce(attempts.c.quizzes_taken, 0),
+        func.coalesce(attempts.c.quiz_score_sum, 0.0),
+        literal(datetime.utcnow(), DateTime),
+    ).select_from(models.User).outerjoin(
+        documents, documents.c.user_id == models.User.id
+    ).outerjoin(
+        attempts, attempts.c.user_id == models.User.id
+    ).where(models.User.id.in_(user_ids))
+
+# Rebuild the counters from the source tables to repair any drift.
+# Without user_id every user is reconciled.
+def reconcile_user_stats(db: Session, user_id: Optional[uuid.UUID] = None) -> int:
+    users = db.query(models.User.id).order_by(models.User.id)
+    if user_id is not None:
+        users = users.filter(models.User.id == user_id)
+    user_ids = [uid for (uid,) in users]
+
+    for start in range(0, len(user_ids), RECONCILE_BATCH_SIZE):
+        batch = user_ids[start:start + RECONCILE_BATCH_SIZE]
+        # Lock the counters first so apply_delta can't change them between our
+        # count and our write; waits for transactions that already changed them.
+        # Rows are created beforehand so there is something to lock.
+        db.execute(
+            insert(models.UserStats)
+            .values([{"user_id": uid} for uid in batch])
+            .on_conflict_do_nothing(index_elements=["user_id"])
+        )
+        db.execute(
+            select(models.UserStats.user_id)
+            .where(models.UserStats.user_id.in_(batch))
+            .order_by(models.UserStats.user_id)
+            .with_for_update()
+        )
+        # One statement per batch; it sees everything committed before the locks were taken
+        statement = insert(models.UserStats).from_select(
+            ["user_id", *RECONCILED_COLUMNS], _rebuilt_counters(batch)
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={column: statement.excluded[column] for column in RECONCILED_COLUMNS},
+        )
+        db.execute(statement)
+        db.commit()
+    return len(user_ids)
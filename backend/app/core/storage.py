@@ -0,0 +1,418 @@
+import bisect
+import io
+import os
+import struct
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+import zstandard
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.core.database import SessionLocal
+
+# Compressed copies sit next to the original path with this suffix. Code keeps
+# using the original path and opens it through open_file(), which picks
+# whichever copy exists.
+COMPRESSED_SUFFIX = ".zst"
+
+# zstd seekable format: independent frames followed by a seek table in a
+# skippable frame, so the files can also be read by the zstd contrib tools
+SKIPPABLE_MAGIC = 0x184D2A5E
+SEEKABLE_MAGIC = 0x8F92EAB1
+SEEK_TABLE_FOOTER_SIZE = 9
+SEEK_TABLE_ENTRY_SIZE = 8
+
+# --- SEEKABLE FILES ---
+
+def compress_file(source_path: str, target_path: str, frame_size: int = settings.STORAGE_FRAME_SIZE, level: int = settings.STORAGE_COMPRESSION_LEVEL) -> int:
+    """
+    Write source_path as a seekable zstd file: one independent frame per
+    frame_size bytes of input and a seek table at the end. Returns the size
+    of the compressed file.
+    """
+    compressor = zstandard.ZstdCompressor(level=level, write_checksum=True)
+    entries = []
+    with open(source_path, "rb") as source, open(target_path, "wb") as target:
+        while True:
+            chunk = source.read(frame_size)
+            if not chunk:
+                break
+            frame = compressor.compress(chunk)
+            target.write(frame)
+            entries.append((len(frame), len(chunk)))
+
+        seek_table = b"".join(struct.pack("<II", *entry) for entry in entries)
+        seek_table += struct.pack("<IBI", len(entries), 0, SEEKABLE_MAGIC)
+        target.write(struct.pack("<II", SKIPPABLE_MAGIC, len(seek_table)))
+        target.write(seek_table)
+        target.flush()
+        os.fsync(target.fileno())
+        return target.tell()
+
+def decompress_file(source_path: str, target_path: str):
+    with SeekableReader(source_path) as source, open(target_path, "wb") as target:
+        for index in range(len(source.frames)):
+            target.write(source.read_frame(index))
+        target.flush()
+        os.fsync(target.fileno())
+
+# Read-only, seekable file object over a seekable zstd file. Only the frames
+# that cover the requested bytes are decompressed, so a range request or a
+# PdfReader jumping around the file never inflates the whole document.
+class SeekableReader(io.RawIOBase):
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        try:
+            # (compressed offset, compressed size, decompressed offset, decompressed size) per frame
+            self.frames: List[Tuple[int, int, int, int]] = self._read_seek_table()
+        except Exception:
+            self._file.close()
+            raise
+        self._starts = [frame[2] for frame in self.frames]
+        self.size = self.frames[-1][2] + self.frames[-1][3] if self.frames else 0
+        self._position = 0
+        self._decompressor = zstandard.ZstdDecompressor()
+        # The last decompressed frame; reads are mostly sequential within a frame
+        self._cached_index = -1
+        self._cached_data = b""
+
+    def _read_seek_table(self) -> List[Tuple[int, int, int, int]]:
+        self._file.seek(-SEEK_TABLE_FOOTER_SIZE, os.SEEK_END)
+        count, descriptor, magic = struct.unpack("<IBI", self._file.read(SEEK_TABLE_FOOTER_SIZE))
+        if magic != SEEKABLE_MAGIC:
+            raise ValueError("Not a seekable zstd file")
+        entry_size = SEEK_TABLE_ENTRY_SIZE + (4 if descriptor & 0x80 else 0)
+        self._file.seek(-(SEEK_TABLE_FOOTER_SIZE + count * entry_size), os.SEEK_END)
+        table = self._file.read(count * entry_size)
+
+        frames = []
+        compressed_offset = decompressed_offset = 0
+        for index in range(count):
+            compressed_size, decompressed_size = struct.unpack_from("<II", table, index * entry_size)
+            frames.append((compressed_offset, compressed_size, decompressed_offset, decompressed_size))
+            compressed_offset += compressed_size
+            decompressed_offset += decompressed_size
+        return frames
+
+    def read_frame(self, index: int) -> bytes:
+        if index != self._cached_index:
+            compressed_offset, compressed_size, _, decompressed_size = self.frames[index]
+            self._file.seek(compressed_offset)
+            self._cached_data = self._decompressor.decompress(
+                self._file.read(compressed_size), max_output_size=decompressed_size
+            )
+            self._cached_index = index
+        return self._cached_data
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_SET:
+            position = offset
+        elif whence == os.SEEK_CUR:
+            position = self._position + offset
+        elif whence == os.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            raise ValueError("Negative seek position")
+        self._position = position
+        return position
+
+    def readinto(self, buffer):
+        view = memoryview(buffer).cast("B")
+        written = 0
+        while written < len(view) and self._position < self.size:
+            index = bisect.bisect_right(self._starts, self._position) - 1
+            data = self.read_frame(index)
+            start = self._position - self.frames[index][2]
+            length = min(len(view) - written, len(data) - start)
+            view[written:written + length] = data[start:start + length]
+            written += length
+            self._position += length
+        return written
+
+    def close(self):
+        if not self.closed:
+            self._file.close()
+        super().close()
+
+# --- FILE ACCESS ---
+
+def compressed_path(path: str) -> str:
+    return path + COMPRESSED_SUFFIX
+
+def open_file(path: str) -> BinaryIO:
+    """
+    Open a stored file for reading, whichever tier it is in. Compressed files
+    are decompressed frame by frame while being read.
+    """
+    try:
+        return open(path, "rb")
+    except FileNotFoundError:
+        pass
+    try:
+        return io.BufferedReader(SeekableReader(compressed_path(path)))
+    except FileNotFoundError:
+        # Promotion may have just replaced the compressed copy by the raw file
+        return open(path, "rb")
+
+def exists(path: str) -> bool:
+    return os.path.exists(path) or os.path.exists(compressed_path(path))
+
+# Size of the original file, read from the seek table for compressed files
+def file_size(path: str) -> int:
+    with open_file(path) as f:
+        return f.seek(0, os.SEEK_END)
+
+def remove(path: str):
+    for candidate in (path, compressed_path(path)):
+        if os.path.exists(candidate):
+            os.remove(candidate)
+
+# Every file of a document: the current one and those of earlier versions
+def document_paths(db: Session, doc: models.Document) -> List[str]:
+    paths = {doc.file_path}
+    paths.update(
+        path for (path,) in db.query(models.DocumentVersion.file_path).filter(
+            models.DocumentVersion.document_id == doc.id
+        )
+    )
+    return sorted(paths)
+
+# --- TIERING ---
+
+def compress_to_temp(path: str) -> Optional[str]:
+    """
+    Write a compressed copy of a raw file next to it, to be moved in place later.
+    Returns its path, or None if the file is not raw or compression doesn't
+    save enough space.
+    """
+    if not os.path.exists(path):
+        return None
+    temp_path = compressed_path(path) + ".tmp"
+    try:
+        raw_size = os.path.getsize(path)
+        size = compress_file(path, temp_path)
+    except Exception:
+        remove_temp(temp_path)
+        raise
+    if size > raw_size * (1 - settings.STORAGE_MIN_SAVINGS):
+        remove_temp(temp_path)
+        return None
+    return temp_path
+
+def remove_temp(temp_path: Optional[str]):
+    if temp_path and os.path.exists(temp_path):
+        os.remove(temp_path)
+
+# (claimed_at, last_accessed_at, file_path, paths) of a document claimed for compression
+Claim = Tuple[datetime, Optional[datetime], str, List[str]]
+
+def claim_document(document_id: uuid.UUID, cutoff: datetime) -> Optional[Claim]:
+    """
+    Mark a cold document as being compressed, in a short transaction of its
+    own. Claims older than STORAGE_CLAIM_TIMEOUT_MINUTES were left behind by a
+    worker that died and can be taken over.
+    """
+    stale = datetime.utcnow() - timedelta(minutes=settings.STORAGE_CLAIM_TIMEOUT_MINUTES)
+    db = SessionLocal()
+    try:
+        # Skip documents that are being promoted or updated right now
+        doc = db.query(models.Document).filter(
+            models.Document.id == document_id,
+            models.Document.last_accessed_at < cutoff,
+            or_(
+                models.Document.storage_tier == "hot",
+                and_(models.Document.storage_tier == "compressing", models.Document.storage_claimed_at < stale)
+            )
+        ).with_for_update(skip_locked=True).first()
+        if doc is None:
+            return None
+        doc.storage_tier = "compressing"
+        doc.storage_claimed_at = datetime.utcnow()
+        claim = (doc.storage_claimed_at, doc.last_accessed_at, doc.file_path, document_paths(db, doc))
+        db.commit()
+        return claim
+    finally:
+        db.close()
+
+def swap_document(document_id: uuid.UUID, claim: Claim, temp_paths: Dict[str, Optional[str]]) -> Optional[str]:
+    """
+    Move the compressed copies in place and set the tier, unless the document
+    changed since it was claimed. Returns the new tier, or None if the copies
+    were not used.
+    """
+    claimed_at, last_accessed_at, file_path, _ = claim
+    db = SessionLocal()
+    try:
+        doc = db.query(models.Document).filter(
+            models.Document.id == document_id
+        ).with_for_update().first()
+        # Deleted, given a new version (which makes it hot again) or claimed by someone else
+        if doc is None or doc.storage_tier != "compressing" or doc.storage_claimed_at != claimed_at:
+            return None
+        # Opened while we were compressing: it isn't cold after all
+        if doc.file_path != file_path or doc.last_accessed_at != last_accessed_at:
+            doc.storage_tier = "hot"
+            doc.storage_claimed_at = None
+            db.commit()
+            return None
+
+        for path, temp_path in temp_paths.items():
+            if temp_path is not None:
+                os.replace(temp_path, compressed_path(path))
+                # Readers that opened the raw file keep reading it after the unlink
+                os.remove(path)
+        compressed = not os.path.exists(file_path) and os.path.exists(compressed_path(file_path))
+        doc.storage_tier = "cold" if compressed else "incompressible"
+        doc.storage_claimed_at = None
+        db.commit()
+        return doc.storage_tier
+    finally:
+        db.close()
+
+def compact_document(document_id: uuid.UUID, cutoff: datetime) -> Optional[str]:
+    """
+    Compress the files of a document nobody has opened since cutoff.
+    Returns the new tier, or None if the document was skipped.
+    The row is claimed with the "compressing" tier instead of being locked
+    while compressing, so downloads and new versions never wait for us.
+    """
+    temp_paths: Dict[str, Optional[str]] = {}
+    try:
+        claim = claim_document(document_id, cutoff)
+        if claim is None:
+            return None
+        for path in claim[3]:
+            temp_paths[path] = compress_to_temp(path)
+        return swap_document(document_id, claim, temp_paths)
+    except Exception as e:
+        print(f"Error compacting document {document_id}: {e}")
+        return None
+    finally:
+        # Copies that were not moved in place
+        for temp_path in temp_paths.values():
+            remove_temp(temp_path)
+
+def promote_document(document_id: uuid.UUID):
+    """
+    Decompress the current file of a cold document that is being used again.
+    Files of earlier versions stay compressed.
+    """
+    db = SessionLocal()
+    try:
+        doc = db.query(models.Document).filter(
+            models.Document.id == document_id
+        ).with_for_update().first()
+        if doc is None or doc.storage_tier != "cold":
+            return
+
+        path = doc.file_path
+        if not os.path.exists(path):
+            temp_path = path + ".tmp"
+            decompress_file(compressed_path(path), temp_path)
+            os.replace(temp_path, path)
+        doc.storage_tier = "hot"
+        db.commit()
+        if os.path.exists(compressed_path(path)):
+            os.remove(compressed_path(path))
+    except Exception as e:
+        db.rollback()
+        print(f"Error promoting document {document_id}: {e}")
+    finally:
+        db.close()
+
+def touch(db: Session, doc: models.Document) -> bool:
+    """
+    Record that a document was opened. The timestamp is only written once per
+    STORAGE_TOUCH_INTERVAL_MINUTES so range requests don't each cause a write.
+    Returns True if the document is cold and should be promoted. The caller commits.
+    """
+    now = datetime.utcnow()
+    if doc.last_accessed_at is None or now - doc.last_accessed_at >= timedelta(minutes=settings.STORAGE_TOUCH_INTERVAL_MINUTES):
+        doc.last_accessed_at = now
+    return doc.storage_tier == "cold"
+
+# Background thread that moves documents nobody opened for a while to the cold tier
+class StorageCompactor:
+    def __init__(
+        self,
+        interval: float = settings.STORAGE_COMPACT_INTERVAL_SECONDS,
+        cold_after: timedelta = timedelta(days=settings.STORAGE_COLD_AFTER_DAYS),
+        batch_size: int = settings.STORAGE_COMPACT_BATCH_SIZE,
+    ):
+        self.interval = interval
+        self.cold_after = cold_after
+        self.batch_size = batch_size
+
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="storage-compactor", daemon=True)
+        self._thread.start()
+
+    # Stop after the document being compressed right now
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        self._thread.join()
+        self._thread = None
+
+    def compact(self) -> int:
+        """
+        Compress one batch of documents that went cold. Returns how many were compressed.
+        """
+        cutoff = datetime.utcnow() - self.cold_after
+        db = SessionLocal()
+        try:
+            # Served by the (storage_tier, last_accessed_at) index; "compressing"
+            # also finds claims a dead worker left behind, claim_document checks their age
+            document_ids = [
+                document_id for (document_id,) in db.query(models.Document.id).filter(
+                    models.Document.storage_tier.in_(["hot", "compressing"]),
+                    models.Document.last_accessed_at < cutoff
+                ).order_by(models.Document.last_accessed_at).limit(self.batch_size)
+            ]
+        finally:
+            db.close()
+
+        compressed = 0
+        for document_id in document_ids:
+            if self._stopping:
+                break
+            if compact_document(document_id, cutoff) == "cold":
+                compressed += 1
+        return compressed
+
+    def _run(self):
+        while not self._stopping:
+            try:
+                self.compact()
+            except Exception as e:
+                print(f"Error compacting storage: {e}")
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+
+# Shared compactor, started and stopped together with the app (see app/main.py)
+compactor = StorageCompactor()
@@ -0,0 +1,87 @@
+import uuid
+from typing import List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.extraction import extract_pages, fingerprint_pages
+
+# Record a newly uploaded file as the next version of a document. The caller commits.
+def add_version(db: Session, doc: models.Document, filename: str, file_path: str, size: int) -> models.DocumentVersion:
+    version = models.DocumentVersion(
+        document_id=doc.id,
+        version=doc.current_version or 1,
+        filename=filename,
+        file_path=file_path,
+        size=size,
+    )
+    db.add(version)
+    return version
+
+def get_version(db: Session, document_id: uuid.UUID, version: int) -> models.DocumentVersion:
+    return db.query(models.DocumentVersion).filter(
+        models.DocumentVersion.document_id == document_id,
+        models.DocumentVersion.version == version
+    ).first()
+
+def sync_pages(db: Session, doc: models.Document, version: models.DocumentVersion) -> List[int]:
+    """
+    Fingerprint the pages of a version and extract text only for pages whose
+    content we have not seen in any earlier version of the document.
+    Returns the numbers of those pages; everything else keeps its text.
+    The caller commits.
+    """
+    hashes = fingerprint_pages(version.file_path, doc.file_type)
+
+    known = {
+        content_hash for (content_hash,) in db.query(models.PageContent.content_hash).filter(
+            models.PageContent.document_id == doc.id,
+            models.PageContent.content_hash.in_(set(hashes))
+        )
+    }
+    # A page that appears twice in the new version only needs to be extracted once
+    new_indexes = {}
+    for index, content_hash in enumerate(hashes):
+        if content_hash not in known and content_hash not in new_indexes:
+            new_indexes[content_hash] = index
+
+    if new_indexes:
+        texts = extract_pages(version.file_path, doc.file_type, new_indexes.values())
+        db.add_all(
+            models.PageContent(document_id=doc.id, content_hash=content_hash, text=texts[index])
+            for content_hash, index in new_indexes.items()
+        )
+        db.flush()
+
+    # Reprocessing the same version replaces its page list
+    db.query(models.DocumentPage).filter(
+        models.DocumentPage.document_id == doc.id,
+        models.DocumentPage.version == version.version
+    ).delete()
+    if hashes:
+        db.execute(insert(models.DocumentPage), [
+            {"document_id": doc.id, "version": version.version, "page_number": number, "content_hash": content_hash}
+            for number, content_hash in enumerate(hashes, start=1)
+        ])
+
+    changed = sorted(index + 1 for index, content_hash in enumerate(hashes) if content_hash in new_indexes)
+    version.page_count = len(hashes)
+    version.changed_pages = changed
+    return changed
+
+# Text of the given pages (all pages if None) of a version, in page order
+def version_text(db: Session, document_id: uuid.UUID, version: int, first_page: Optional[int] = None, last_page: Optional[int] = None) -> List[str]:
+    query = db.query(models.PageContent.text).join(
+        models.DocumentPage,
+        (models.DocumentPage.document_id == models.PageContent.document_id)
+        & (models.DocumentPage.content_hash == models.PageContent.content_hash)
+    ).filter(
+        models.DocumentPage.document_id == document_id,
+        models.DocumentPage.version == version
+    )
+    if first_page is not None:
+        query = query.filter(models.DocumentPage.page_number >= first_page)
+    if last_page is not None:
+        query = query.filter(models.DocumentPage.page_number <= last_page)
+    return [text for (text,) in query.order_by(models.DocumentPage.page_number)]
@@ -1,10 +1,31 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from fastapi.staticfiles import StaticFiles
-from app.api.v1 import api
+from app.core.activity import recorder
+from app.core.admission import admission, AdmissionMiddleware, PRIORITY_NORMAL
+from app.core.storage import compactor
+from app.core.revocation import revocations
+from app.api.v1 import api, files
 
-app = FastAPI(title=settings.PROJECT_NAME)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background writer for activity events and last_login updates
+    recorder.start()
+    # Measures event loop lag for load shedding
+    admission.start()
+    # Compresses files of documents nobody opened for a while
+    compactor.start()
+    # Loads revoked tokens into memory and keeps them in sync
+    revocations.start()
+    yield
+    revocations.stop()
+    compactor.stop()
+    await admission.stop()
+    # Write out everything still buffered before the process exits
+    recorder.stop()
+
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
 origins = [
     "http://localhost:5173",
@@ -16,6 +37,9 @@ origins = [
     "http://localhost:3000",
 ]
 
+# Added before CORS so that 503 responses still get CORS headers
+app.add_middleware(AdmissionMiddleware, controller=admission)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -24,8 +48,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Allow the frontend to access uploaded files
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Allow the frontend to access uploaded files (cold files are decompressed on the fly)
+app.include_router(files.router, prefix="/uploads", tags=["files"])
+admission.set_priority("/uploads", PRIORITY_NORMAL, streaming=True)
 
 app.include_router(api.api_router, prefix=settings.API_V1_STR)
 
@@ -1,2 +1,10 @@
 from .user import User
 from .document import Document
+from .upload import UploadSession
+from .activity import Activity
+from .stats import UserStats
+from .dedup import DocumentSignature, LshBucket
+from .version import DocumentVersion, PageContent, DocumentPage
+from .quiz import Quiz, QuizQuestion, QuizAttempt, QuizAnswer, ReviewState
+from .chapter import Chapter
+from .token import RefreshToken, RevokedToken
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, String, BigInteger, DateTime, ForeignKey, UUID, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime
+
+from app.core.database import Base
+
+# One entry in a user's activity feed (login, upload, quiz attempt, ...)
+class Activity(Base):
+    __tablename__ = "activities"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
+    type = Column(String(20), nullable=False) # e.g., login, document, quiz
+    title = Column(String(255), nullable=False) # Text shown in the dashboard feed
+    details = Column(JSONB, default={})
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # The feed always asks for "latest N for this user", so we index exactly that
+    __table_args__ = (
+        Index("ix_activities_user_id_created_at", "user_id", created_at.desc()),
+    )
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, String, Integer, ForeignKey, UUID, Index
+import uuid
+
+from app.core.database import Base
+
+# A chapter or section of one version of a document, with the pages it covers
+class Chapter(Base):
+    __tablename__ = "chapters"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
+    version = Column(Integer, nullable=False) # DocumentVersion.version it was detected in
+
+    position = Column(Integer, nullable=False) # Order inside the document, starting at 1
+    level = Column(Integer, nullable=False, default=1) # 1 = chapter, 2 = section
+    title = Column(String(255), nullable=False)
+    start_page = Column(Integer, nullable=False) # Pages start at 1, both ends included
+    end_page = Column(Integer, nullable=False)
+    source = Column(String(20), nullable=False) # outline (PDF bookmarks) or heading (text heuristics)
+
+    __table_args__ = (
+        Index("ix_chapters_document_id_version_position", "document_id", "version", "position"),
+    )
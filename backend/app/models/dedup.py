@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, BigInteger, LargeBinary, ForeignKey, UUID, Index
+
+from app.core.database import Base
+
+# MinHash signature of a document's extracted text
+class DocumentSignature(Base):
+    __tablename__ = "document_signatures"
+
+    document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True)
+    signature = Column(LargeBinary, nullable=False) # NUM_PERM little-endian uint32 values
+    shingle_count = Column(Integer, nullable=False)
+
+# LSH index: one row per (document, band). Documents that share a bucket in
+# any band are candidates for being near-duplicates.
+class LshBucket(Base):
+    __tablename__ = "lsh_buckets"
+
+    # Lookups are always "this user's documents in these buckets", so the key starts with user_id
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    band = Column(Integer, primary_key=True)
+    bucket_hash = Column(BigInteger, primary_key=True)
+    document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True)
+
+    __table_args__ = (
+        Index("ix_lsh_buckets_document_id", "document_id"),
+    )
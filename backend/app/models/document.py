@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, UUID
+from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, UUID, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -17,9 +17,10 @@ class Document(Base):
     
     # Basic file information
     filename = Column(String(255), nullable=False)
-    file_path = Column(String(500), nullable=False) # Where the file is on the server
+    file_path = Column(String(500), nullable=False, index=True) # Where the file is on the server
     file_type = Column(String(50), nullable=False) # e.g., pdf, docx
     size = Column(Integer, nullable=False) # Size in bytes
+    current_version = Column(Integer, nullable=False, default=1, server_default="1") # Latest DocumentVersion
     
     # Status of our AI processing (Analyzed, Processing, or Error)
     status = Column(String(20), default="Processing")
@@ -28,5 +29,22 @@ class Document(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     processed_at = Column(DateTime, nullable=True) # When AI finishes analyzing
 
+    # Set when the text is nearly the same as an earlier document of the same user,
+    # so summaries and quizzes of that document can be reused
+    duplicate_of_id = Column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="SET NULL"), nullable=True, index=True)
+    duplicate_similarity = Column(Float, nullable=True) # Estimated Jaccard similarity (0-1)
+
+    # Storage tier of the current file: hot (raw), cold (zstd compressed),
+    # incompressible (kept raw because compression didn't pay off) or
+    # compressing (claimed by the compactor at storage_claimed_at)
+    storage_tier = Column(String(20), nullable=False, default="hot", server_default="hot")
+    storage_claimed_at = Column(DateTime, nullable=True)
+    last_accessed_at = Column(DateTime, default=datetime.utcnow) # Last time the file was opened
+
     # This sets up a link back to the User model
     owner = relationship("User", back_populates="documents")
+
+    __table_args__ = (
+        # Finding documents that went cold
+        Index("ix_documents_storage_tier_last_accessed_at", "storage_tier", "last_accessed_at"),
+    )
@@ -0,0 +1,81 @@
+from sqlalchemy import Column, String, Integer, BigInteger, Float, Text, Boolean, DateTime, ForeignKey, UUID, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime
+import uuid
+
+from app.core.database import Base
+
+# A generated quiz for a document
+class Quiz(Base):
+    __tablename__ = "quizzes"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Empty when the quiz covers the whole document
+    chapter_id = Column(UUID(as_uuid=True), ForeignKey("chapters.id", ondelete="SET NULL"), nullable=True, index=True)
+
+    title = Column(String(255), nullable=False)
+    difficulty = Column(String(20), default="Medium")
+    status = Column(String(20), default="Ready") # Generating, Ready or Failed
+    # Shared quizzes can be taken by everybody in the owner's department
+    shared = Column(Boolean, nullable=False, default=False, server_default="false")
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class QuizQuestion(Base):
+    __tablename__ = "quiz_questions"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    quiz_id = Column(UUID(as_uuid=True), ForeignKey("quizzes.id", ondelete="CASCADE"), nullable=False, index=True)
+    position = Column(Integer, nullable=False) # Order inside the quiz
+
+    text = Column(Text, nullable=False)
+    type = Column(String(20), nullable=False) # multiple_choice or true_false
+    options = Column(JSONB, nullable=False)
+    correct_index = Column(Integer, nullable=False)
+    explanation = Column(Text, default="")
+
+# One time a user answered a quiz (or a batch of review questions, then quiz_id is empty)
+class QuizAttempt(Base):
+    __tablename__ = "quiz_attempts"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    quiz_id = Column(UUID(as_uuid=True), ForeignKey("quizzes.id", ondelete="CASCADE"), nullable=True, index=True)
+
+    correct_count = Column(Integer, nullable=False)
+    total_count = Column(Integer, nullable=False)
+    score = Column(Float, nullable=False) # Percentage, 0-100
+
+    created_at = Column(DateTime, default=datetime.utcnow, index=True) # Indexed for incremental analytics
+
+class QuizAnswer(Base):
+    __tablename__ = "quiz_answers"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    attempt_id = Column(UUID(as_uuid=True), ForeignKey("quiz_attempts.id", ondelete="CASCADE"), nullable=False, index=True)
+    question_id = Column(BigInteger, ForeignKey("quiz_questions.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    selected_index = Column(Integer, nullable=False)
+    is_correct = Column(Boolean, nullable=False)
+    quality = Column(Integer, nullable=False) # 0-5 recall quality used by the review scheduler
+
+# Spaced repetition state of one question for one user (SM-2)
+class ReviewState(Base):
+    __tablename__ = "review_states"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    question_id = Column(BigInteger, ForeignKey("quiz_questions.id", ondelete="CASCADE"), primary_key=True)
+
+    repetitions = Column(Integer, nullable=False, default=0)
+    interval_days = Column(Integer, nullable=False, default=0)
+    easiness = Column(Float, nullable=False, default=2.5)
+    due_at = Column(DateTime, nullable=False)
+    last_reviewed_at = Column(DateTime, nullable=True)
+
+    # "Next N due questions for this user" is a range scan on this index
+    __table_args__ = (
+        Index("ix_review_states_user_id_due_at", "user_id", "due_at"),
+        Index("ix_review_states_question_id", "question_id"),
+    )
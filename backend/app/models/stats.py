@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, BigInteger, Float, DateTime, ForeignKey, UUID
+from datetime import datetime
+
+from app.core.database import Base
+
+# Per-user counters for the dashboard. They are updated in the same transaction
+# as the change they count, so reading the dashboard is a single primary key lookup.
+class UserStats(Base):
+    __tablename__ = "user_stats"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+
+    # Documents by processing status
+    documents_total = Column(Integer, nullable=False, default=0, server_default="0")
+    documents_processing = Column(Integer, nullable=False, default=0, server_default="0")
+    documents_analyzed = Column(Integer, nullable=False, default=0, server_default="0")
+    documents_error = Column(Integer, nullable=False, default=0, server_default="0")
+    total_bytes = Column(BigInteger, nullable=False, default=0, server_default="0")
+
+    # We keep the sum of scores (0-100) so the average can be updated without reading all attempts
+    quizzes_taken = Column(Integer, nullable=False, default=0, server_default="0")
+    quiz_score_sum = Column(Float, nullable=False, default=0.0, server_default="0")
+
+    updated_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, DateTime, ForeignKey, UUID
+from datetime import datetime
+import uuid
+
+from app.core.database import Base
+
+# A refresh token we handed out. Each one can be used once: refreshing marks it
+# used and issues the next token of the same family. A used token showing up
+# again means it was copied, so the whole family is revoked.
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4) # The token's jti
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    family_id = Column(UUID(as_uuid=True), nullable=False, index=True) # Shared by all tokens since one login
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    used_at = Column(DateTime, nullable=True)
+    revoked_at = Column(DateTime, nullable=True)
+
+# An access token revoked before it expired (e.g. on logout). Rows are only
+# needed until expires_at; after that the token is rejected anyway.
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(UUID(as_uuid=True), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, default=datetime.utcnow)
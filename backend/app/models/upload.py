@@ -0,0 +1,30 @@
+from sqlalchemy import Column, String, BigInteger, DateTime, ForeignKey, UUID
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime
+import uuid
+
+from app.core.database import Base
+
+# This model keeps track of a resumable (chunked) upload that is still in progress
+class UploadSession(Base):
+    __tablename__ = "upload_sessions"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    # The user who started the upload
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+
+    # Information about the file we are going to receive
+    filename = Column(String(255), nullable=False)
+    file_type = Column(String(50), nullable=False)
+    total_size = Column(BigInteger, nullable=False) # Size announced by the client in bytes
+    temp_path = Column(String(500), nullable=False) # Preallocated file the chunks are written into
+
+    # Byte ranges we already received, as a sorted list of [start, end) pairs.
+    # Chunks can arrive in parallel and out of order, so a single offset is not enough.
+    received_ranges = Column(JSONB, nullable=False, default=list)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    # Abandoned sessions are removed (with their temp file) after this time
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -17,6 +17,8 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(TIMESTAMP, server_default=text("CURRENT_TIMESTAMP"))
     last_login = Column(TIMESTAMP)
+    # Tokens issued before this time are rejected (set when the password is reset)
+    tokens_valid_after = Column(TIMESTAMP, nullable=True)
     settings = Column(JSONB, default={})
 
     # Link to the user's uploaded documents
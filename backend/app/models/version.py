@@ -0,0 +1,57 @@
+from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, ForeignKeyConstraint, UniqueConstraint, UUID
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime
+import uuid
+
+from app.core.database import Base
+
+# One uploaded edition of a document. The Document row always points at the latest one.
+class DocumentVersion(Base):
+    __tablename__ = "document_versions"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
+    version = Column(Integer, nullable=False) # 1, 2, 3, ...
+
+    filename = Column(String(255), nullable=False)
+    file_path = Column(String(500), nullable=False)
+    size = Column(Integer, nullable=False)
+
+    # Filled in by processing
+    page_count = Column(Integer, nullable=True)
+    changed_pages = Column(JSONB, nullable=True) # Page numbers whose content was not seen in any earlier version
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("document_id", "version", name="uq_document_versions_document_id_version"),
+    )
+
+# Extracted text, stored once per distinct page content.
+# Pages that did not change between versions share the same row.
+class PageContent(Base):
+    __tablename__ = "page_contents"
+
+    document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True)
+    content_hash = Column(String(64), primary_key=True) # sha256 of the page's raw content
+
+    text = Column(Text, nullable=False, default="")
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+# Which content is on which page of a version
+class DocumentPage(Base):
+    __tablename__ = "document_pages"
+
+    document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True)
+    version = Column(Integer, primary_key=True)
+    page_number = Column(Integer, primary_key=True) # Starts at 1
+    content_hash = Column(String(64), nullable=False)
+
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["document_id", "content_hash"],
+            ["page_contents.document_id", "page_contents.content_hash"],
+            ondelete="CASCADE",
+        ),
+    )
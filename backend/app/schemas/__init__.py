@@ -1,2 +1,9 @@
 from .user import UserCreate, UserLogin, UserUpdate, UserResponse
-from .document import DocumentResponse, DocumentCreate
+from .document import DocumentResponse, DocumentCreate, DuplicateClusterResponse, DocumentVersionResponse
+from .upload import UploadSessionCreate, UploadSessionResponse
+from .activity import ActivityResponse
+from .stats import UserStatsResponse
+from .quiz import AnswerSubmit, AttemptSubmit, AnswerResult, AttemptResponse, ReviewQuestionResponse
+from .chapter import ChapterResponse, ChapterScore
+from .token import TokenRefresh, TokenLogout, TokenUser
+from .analytics import ItemStatisticsResponse, QuizAnalyticsResponse, DepartmentScoresResponse
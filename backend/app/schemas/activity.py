@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+# One item of the dashboard activity feed
+class ActivityResponse(BaseModel):
+    id: Optional[int] = None # Not set yet for events still waiting to be flushed
+    type: str
+    title: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
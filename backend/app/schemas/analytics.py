@@ -0,0 +1,34 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+import uuid
+
+# Item analysis of one question
+class ItemStatisticsResponse(BaseModel):
+    question_id: int
+    position: int
+    text: str
+    correct_index: int
+    answered: int
+    p_value: Optional[float] = None # Share of correct answers (0-1), higher = easier
+    point_biserial: Optional[float] = None # Correlation with the rest of the score (-1 to 1), low = doesn't separate strong and weak
+    option_counts: List[int] # How often each option was chosen, wrong ones show how well the distractors work
+
+class QuizAnalyticsResponse(BaseModel):
+    quiz_id: uuid.UUID
+    title: str
+    department: Optional[str] = None # Only attempts of users in this department, all if empty
+    attempt_count: int
+    mean_score: Optional[float] = None # Percentage, 0-100
+    items: List[ItemStatisticsResponse]
+    updated_at: Optional[datetime] = None
+
+class DepartmentScoresResponse(BaseModel):
+    department: Optional[str] = None
+    attempt_count: int
+    mean_score: float
+    std_score: float
+    p25: float
+    median: float
+    p75: float
+    histogram: List[int] # Attempts per 10-point score band, 0-10 up to 90-100
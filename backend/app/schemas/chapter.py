@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Optional
+from uuid import UUID
+
+class ChapterScore(BaseModel):
+    correct: int
+    total: int
+
+# A detected chapter, with the state of its latest quiz (for ChapterCard)
+class ChapterResponse(BaseModel):
+    id: UUID
+    chapter_number: int
+    level: int # 1 = chapter, 2 = section
+    title: str
+    start_page: int
+    end_page: int
+    quiz_id: Optional[UUID] = None
+    quiz_status: str = "not_started" # not_started, ready or completed
+    score: Optional[ChapterScore] = None
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from uuid import UUID
 
@@ -12,6 +12,9 @@ class DocumentResponse(BaseModel):
     status: str
     created_at: datetime
     processed_at: Optional[datetime] = None
+    current_version: int = 1
+    duplicate_of_id: Optional[UUID] = None
+    duplicate_similarity: Optional[float] = None
 
     # This allows Pydantic to work with SQLAlchemy models
     class Config:
@@ -23,3 +26,22 @@ class DocumentCreate(BaseModel):
     filename: str
     file_type: str
     size: int
+
+# A document together with the later uploads that are nearly the same
+class DuplicateClusterResponse(BaseModel):
+    original: DocumentResponse
+    duplicates: List[DocumentResponse]
+
+# One uploaded edition of a document
+class DocumentVersionResponse(BaseModel):
+    id: UUID
+    document_id: UUID
+    version: int
+    filename: str
+    size: int
+    page_count: Optional[int] = None
+    changed_pages: Optional[List[int]] = None # Pages that had to be processed again
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
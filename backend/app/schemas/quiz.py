@@ -0,0 +1,46 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+from uuid import UUID
+
+# One answer sent by the client
+class AnswerSubmit(BaseModel):
+    question_id: int
+    selected_index: int
+    quality: Optional[int] = Field(None, ge=0, le=5) # Optional self-rating of recall (SM-2 scale)
+
+class AttemptSubmit(BaseModel):
+    answers: List[AnswerSubmit] = Field(min_length=1)
+
+class AnswerResult(BaseModel):
+    question_id: int
+    selected_index: int
+    correct_index: int
+    is_correct: bool
+    quality: int
+    due_at: datetime # When this question comes back for review
+
+class AttemptResponse(BaseModel):
+    id: UUID
+    quiz_id: Optional[UUID] = None
+    correct_count: int
+    total_count: int
+    score: float
+    created_at: datetime
+    results: List[AnswerResult] = []
+
+    class Config:
+        from_attributes = True
+
+# A question waiting in the review queue
+class ReviewQuestionResponse(BaseModel):
+    id: int
+    quiz_id: UUID
+    text: str
+    type: str
+    options: List[str]
+    correct_index: int
+    explanation: str
+    due_at: datetime
+    repetitions: int
+    interval_days: int
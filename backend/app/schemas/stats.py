@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+
+# Numbers shown on the dashboard cards
+class UserStatsResponse(BaseModel):
+    documents_total: int = 0
+    documents_processing: int = 0
+    documents_analyzed: int = 0
+    documents_error: int = 0
+    total_bytes: int = 0
+    quizzes_taken: int = 0
+    average_score: float = 0.0 # Percentage, 0-100
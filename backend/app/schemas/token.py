@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import Optional
+import uuid
+
+class TokenRefresh(BaseModel):
+    refresh_token: str
+
+class TokenLogout(BaseModel):
+    refresh_token: Optional[str] = None # Also end the session this refresh token belongs to
+
+# The logged-in user as far as the access token tells. Routes get this instead
+# of the users row so that authenticating a request needs no query.
+class TokenUser(BaseModel):
+    id: uuid.UUID
+    role: str = "employee"
+    department: Optional[str] = None
+    jti: str
+    expires_at: int # Unix time the access token expires
@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from uuid import UUID
+
+# The client sends this to open a new resumable upload
+class UploadSessionCreate(BaseModel):
+    filename: str
+    size: int = Field(gt=0)
+
+# Current state of a resumable upload, so the client knows where to resume from
+class UploadSessionResponse(BaseModel):
+    id: UUID
+    filename: str
+    total_size: int
+    offset: int # Number of bytes received without gaps from the start of the file
+    received_bytes: int # Total bytes received, including chunks after a gap
+    expires_at: datetime
@@ -0,0 +1,17 @@
+from app.core.database import SessionLocal
+from app.core.stats import reconcile_user_stats
+
+# Rebuild the dashboard counters (user_stats) from documents and quiz attempts.
+# Run this from time to time, or after fixing data by hand, to repair drift.
+def reconcile():
+    db = SessionLocal()
+    try:
+        count = reconcile_user_stats(db)
+        print(f"Reconciled stats for {count} users.")
+    except Exception as e:
+        print(f"Error: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    reconcile()
@@ -0,0 +1,22 @@
+from app.core.admission import AdmissionController, PRIORITY_CRITICAL, PRIORITY_LOW, PRIORITY_NORMAL
+
+def make_controller() -> AdmissionController:
+    controller = AdmissionController()
+    controller.set_priority("/api/auth", PRIORITY_CRITICAL)
+    controller.set_priority("/api/documents", PRIORITY_LOW, methods=["GET"], exact=True)
+    controller.set_priority("/api/export", PRIORITY_LOW, streaming=True)
+    return controller
+
+def test_prefix_rules():
+    controller = make_controller()
+    assert controller.rule_for("POST", "/api/auth/login") == (PRIORITY_CRITICAL, False)
+    assert controller.rule_for("GET", "/api/export/") == (PRIORITY_LOW, True)
+    assert controller.rule_for("GET", "/api/exports") == (PRIORITY_NORMAL, False)
+
+def test_exact_rule_only_matches_the_path_itself():
+    controller = make_controller()
+    assert controller.rule_for("GET", "/api/documents") == (PRIORITY_LOW, False)
+    assert controller.rule_for("GET", "/api/documents/") == (PRIORITY_LOW, False)
+    assert controller.rule_for("GET", "/api/documents/duplicates") == (PRIORITY_NORMAL, False)
+    assert controller.rule_for("GET", "/api/documents/123/chapters") == (PRIORITY_NORMAL, False)
+    assert controller.rule_for("POST", "/api/documents/") == (PRIORITY_NORMAL, False)
@@ -0,0 +1,100 @@
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.core.analytics import ItemStatistics
+
+QUESTION_IDS = [11, 12, 13, 14]
+
+class FakeSession:
+    """
+    Just enough of a Session for ItemStatistics.load_questions
+    """
+    def __init__(self):
+        self.questions = [
+            SimpleNamespace(id=question_id, position=position, text=f"Q{position}", correct_index=0, options=["a", "b", "c"])
+            for position, question_id in enumerate(QUESTION_IDS, start=1)
+        ]
+
+    def get(self, model, key):
+        return SimpleNamespace(title="Quiz")
+
+    def query(self, *args):
+        return self
+
+    def filter(self, *args):
+        return self
+
+    def order_by(self, *args):
+        return self
+
+    def all(self):
+        return self.questions
+
+def make_statistics() -> ItemStatistics:
+    statistics = ItemStatistics(uuid.uuid4())
+    statistics.load_questions(FakeSession())
+    return statistics
+
+def answer_columns(correct: np.ndarray, selected: np.ndarray):
+    """
+    Flatten an (attempts, questions) matrix into the columns add_answers takes
+    """
+    attempts, questions = correct.shape
+    question_ids = np.tile(np.array(QUESTION_IDS, dtype=np.int64), attempts)
+    attempt_correct = np.repeat(correct.sum(axis=1).astype(np.float64), questions)
+    return question_ids, selected.ravel(), correct.ravel(), attempt_correct
+
+@pytest.fixture
+def answers():
+    rng = np.random.default_rng(7)
+    ability = rng.normal(size=(300, 1))
+    difficulty = np.array([-1.0, 0.0, 0.5, 1.5])
+    correct = rng.random((300, 4)) < 1 / (1 + np.exp(difficulty - ability))
+    selected = np.where(correct, 0, rng.integers(1, 3, size=correct.shape)).astype(np.int64)
+    return correct, selected
+
+def test_point_biserial_matches_corrcoef(answers):
+    correct, selected = answers
+    statistics = make_statistics()
+    statistics.add_answers(*answer_columns(correct, selected))
+    items = statistics.result()["items"]
+
+    totals = correct.sum(axis=1)
+    for index, item in enumerate(items):
+        x = correct[:, index].astype(np.float64)
+        rest = totals - x
+        assert item["answered"] == len(x)
+        assert item["p_value"] == pytest.approx(x.mean())
+        assert item["point_biserial"] == pytest.approx(np.corrcoef(x, rest)[0, 1])
+        assert sum(item["option_counts"]) == len(x)
+        assert item["option_counts"][0] == int(x.sum())
+
+def test_batches_add_up(answers):
+    correct, selected = answers
+    whole = make_statistics()
+    whole.add_answers(*answer_columns(correct, selected))
+    split = make_statistics()
+    split.add_answers(*answer_columns(correct[:100], selected[:100]))
+    split.add_answers(*answer_columns(correct[100:], selected[100:]))
+    for expected, item in zip(whole.result()["items"], split.result()["items"]):
+        assert item["point_biserial"] == pytest.approx(expected["point_biserial"])
+        assert item["option_counts"] == expected["option_counts"]
+
+def test_undefined_without_variance():
+    statistics = make_statistics()
+    correct = np.ones((5, 4), dtype=bool)
+    statistics.add_answers(*answer_columns(correct, np.zeros((5, 4), dtype=np.int64)))
+    item = statistics.result()["items"][0]
+    assert item["p_value"] == 1.0
+    assert item["point_biserial"] is None
+
+def test_unknown_questions_are_ignored():
+    statistics = make_statistics()
+    statistics.add_answers(
+        np.array([11, 99], dtype=np.int64), np.array([0, 0], dtype=np.int64),
+        np.array([True, True]), np.array([2.0, 2.0])
+    )
+    assert [item["answered"] for item in statistics.result()["items"]] == [1, 0, 0, 0]
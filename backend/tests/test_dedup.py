@@ -0,0 +1,44 @@
+import numpy as np
+
+from app.core import dedup
+
+TEXT = " ".join(f"word{i}" for i in range(400))
+
+def test_identical_texts_have_identical_signatures():
+    first = dedup.minhash_signature(dedup.shingle_hashes(TEXT))
+    second = dedup.minhash_signature(dedup.shingle_hashes(TEXT.upper()))
+    assert first.dtype == dedup.SIGNATURE_DTYPE
+    assert len(first) == dedup.NUM_PERM
+    assert np.array_equal(first, second)
+    assert dedup.band_hashes(first) == dedup.band_hashes(second)
+
+def test_similarity_estimates_jaccard():
+    words = TEXT.split()
+    # Replacing the last 40 words changes 44 of 396 shingles: Jaccard = 352 / 440 = 0.8
+    edited = " ".join(words[:360] + [f"other{i}" for i in range(40)])
+    signature = dedup.minhash_signature(dedup.shingle_hashes(TEXT))
+    candidates = np.stack([
+        dedup.minhash_signature(dedup.shingle_hashes(edited)),
+        dedup.minhash_signature(dedup.shingle_hashes("something else entirely, not the same text at all")),
+    ])
+    scores = dedup.similarities(signature, candidates)
+    assert abs(scores[0] - 0.8) < 0.15
+    assert scores[1] < 0.1
+
+def test_similar_documents_share_a_bucket():
+    words = TEXT.split()
+    edited = " ".join(words[:390] + ["changed"] * 10)
+    first = set(dedup.band_hashes(dedup.minhash_signature(dedup.shingle_hashes(TEXT))))
+    second = set(dedup.band_hashes(dedup.minhash_signature(dedup.shingle_hashes(edited))))
+    assert len(first) == dedup.BANDS
+    assert first & second
+
+def test_short_text_is_one_shingle():
+    assert len(dedup.shingle_hashes("only three words")) == 1
+
+def test_text_without_shingles():
+    hashes = dedup.shingle_hashes("  ... --- !!! ")
+    assert len(hashes) == 0
+    # No shingles leaves the signature at its initial value, which index_document never stores
+    signature = dedup.minhash_signature(hashes)
+    assert np.all(signature == np.iinfo(np.uint32).max)
@@ -0,0 +1,24 @@
+import uuid
+
+from app.core.revocation import BloomFilter
+
+def test_added_keys_are_always_found():
+    bloom = BloomFilter(1000, 0.01)
+    keys = [str(uuid.uuid4()) for _ in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+
+def test_false_positive_rate():
+    rate = 0.01
+    bloom = BloomFilter(10000, rate)
+    for _ in range(10000):
+        bloom.add(str(uuid.uuid4()))
+    checked = 20000
+    false_positives = sum(str(uuid.uuid4()) in bloom for _ in range(checked))
+    # Filled to capacity, the rate should be close to the configured one
+    assert false_positives / checked < rate * 2
+
+def test_empty_filter():
+    bloom = BloomFilter(0, 0.001)
+    assert "anything" not in bloom
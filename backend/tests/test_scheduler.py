@@ -0,0 +1,24 @@
+import pytest
+
+from app.core.scheduler import DEFAULT_EASINESS, MIN_EASINESS, sm2
+
+def test_interval_steps():
+    state = (0, 0, DEFAULT_EASINESS)
+    state = sm2(*state, 5)
+    assert state[:2] == (1, 1)
+    state = sm2(*state, 5)
+    assert state[:2] == (2, 6)
+    state = sm2(*state, 5)
+    # Easiness went up by 0.1 for each of the two answers before: 6 * 2.7
+    assert state[:2] == (3, round(6 * 2.7))
+
+def test_quality_four_keeps_easiness():
+    assert sm2(2, 6, DEFAULT_EASINESS, 4) == (3, 15, pytest.approx(DEFAULT_EASINESS))
+
+def test_forgotten_starts_over():
+    repetitions, interval_days, easiness = sm2(5, 40, DEFAULT_EASINESS, 1)
+    assert (repetitions, interval_days) == (0, 1)
+    assert easiness == pytest.approx(DEFAULT_EASINESS - 0.54)
+
+def test_easiness_has_a_floor():
+    assert sm2(0, 0, MIN_EASINESS, 0)[2] == MIN_EASINESS
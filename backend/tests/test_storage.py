@@ -0,0 +1,70 @@
+import os
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.files import parse_range
+from app.core import storage
+
+FRAME_SIZE = 1000
+
+@pytest.fixture
+def compressed(tmp_path):
+    data = bytes(range(256)) * 20 # 5120 bytes: five full frames and a partial one
+    source = tmp_path / "source.bin"
+    source.write_bytes(data)
+    target = tmp_path / "source.bin.zst"
+    storage.compress_file(str(source), str(target), frame_size=FRAME_SIZE)
+    return data, str(target)
+
+def test_seek_table(compressed):
+    data, path = compressed
+    with storage.SeekableReader(path) as reader:
+        assert len(reader.frames) == 6
+        assert reader.size == len(data)
+        assert reader.seek(0, os.SEEK_END) == len(data)
+
+def test_read_across_frame_boundary(compressed):
+    data, path = compressed
+    with storage.SeekableReader(path) as reader:
+        reader.seek(FRAME_SIZE - 10)
+        assert reader.read(30) == data[FRAME_SIZE - 10:FRAME_SIZE + 20]
+        assert reader.tell() == FRAME_SIZE + 20
+        # Back into a frame that is no longer cached
+        reader.seek(5)
+        assert reader.read(10) == data[5:15]
+
+def test_read_past_the_end(compressed):
+    data, path = compressed
+    with storage.SeekableReader(path) as reader:
+        reader.seek(len(data) - 5)
+        assert reader.read(100) == data[-5:]
+        assert reader.read(100) == b""
+
+def test_open_file_reads_the_compressed_copy(compressed):
+    data, path = compressed
+    raw_path = path[:-len(storage.COMPRESSED_SUFFIX)]
+    os.remove(raw_path)
+    with storage.open_file(raw_path) as f:
+        assert f.read() == data
+    assert storage.file_size(raw_path) == len(data)
+
+def test_parse_range():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=90-500", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=-500", 100) == (0, 99)
+
+def test_parse_range_ignores_what_it_does_not_understand():
+    assert parse_range("bytes=0-9,20-29", 100) is None
+    assert parse_range("items=0-9", 100) is None
+    assert parse_range("bytes=-", 100) is None
+    assert parse_range("bytes=10-5", 100) is None
+
+def test_parse_range_past_the_end():
+    with pytest.raises(HTTPException) as error:
+        parse_range("bytes=100-", 100)
+    assert error.value.status_code == 416
+    assert error.value.headers["Content-Range"] == "bytes */100"
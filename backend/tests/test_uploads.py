@@ -0,0 +1,29 @@
+from app.api.v1.uploads import contiguous_offset, merge_ranges
+
+def test_merge_into_empty():
+    assert merge_ranges([], 0, 100) == [[0, 100]]
+
+def test_merge_adjacent_ranges():
+    # Ranges are [start, end) so 100 touches the first range
+    assert merge_ranges([[0, 100]], 100, 200) == [[0, 200]]
+    assert merge_ranges([[100, 200]], 0, 100) == [[0, 200]]
+
+def test_merge_overlapping_ranges():
+    assert merge_ranges([[0, 150]], 100, 200) == [[0, 200]]
+    assert merge_ranges([[0, 300]], 100, 200) == [[0, 300]]
+
+def test_merge_fills_a_gap():
+    assert merge_ranges([[0, 100], [200, 300]], 100, 200) == [[0, 300]]
+
+def test_merge_keeps_gaps():
+    assert merge_ranges([[0, 100], [300, 400]], 150, 200) == [[0, 100], [150, 200], [300, 400]]
+
+def test_merge_does_not_change_input():
+    ranges = [[0, 100]]
+    merge_ranges(ranges, 50, 200)
+    assert ranges == [[0, 100]]
+
+def test_contiguous_offset():
+    assert contiguous_offset([]) == 0
+    assert contiguous_offset([[100, 200]]) == 0
+    assert contiguous_offset([[0, 100], [200, 300]]) == 100
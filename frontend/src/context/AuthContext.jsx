@@ -1,5 +1,5 @@
 import React, { createContext, useState, useContext, useEffect } from 'react';
-import { login as loginService, register as registerService } from '../services/auth';
+import { login as loginService, logout as logoutService, register as registerService } from '../services/auth';
 
 const AuthContext = createContext(null);
 
@@ -20,6 +20,7 @@ export const AuthProvider = ({ children }) => {
     const login = async (email, password) => {
         const data = await loginService(email, password);
         localStorage.setItem('token', data.access_token);
+        localStorage.setItem('refreshToken', data.refresh_token);
         setUser({ token: data.access_token });
         return data;
     };
@@ -28,8 +29,17 @@ export const AuthProvider = ({ children }) => {
         return await registerService(userData);
     };
 
-    const logout = () => {
+    const logout = async () => {
+        // The request interceptor reads the access token from storage, so it is
+        // only cleared once the server has ended the session
+        const refreshToken = localStorage.getItem('refreshToken');
+        try {
+            await logoutService(refreshToken);
+        } catch {
+            // Logged out locally anyway; the tokens expire on their own
+        }
         localStorage.removeItem('token');
+        localStorage.removeItem('refreshToken');
         setUser(null);
     };
 
@@ -18,4 +18,54 @@ api.interceptors.request.use(
     (error) => Promise.reject(error)
 );
 
+// Trade the refresh token for new tokens. Each refresh token works once and
+// the server ends the session if one is used twice, so tabs (which share
+// localStorage) refresh one at a time under a Web Lock: a tab that waited
+// for another tab finds newer tokens in storage and just uses them.
+const refreshTokens = (staleRefreshToken) => {
+    const refresh = async () => {
+        const refreshToken = localStorage.getItem('refreshToken');
+        if (!refreshToken) {
+            throw new Error('Logged out in another tab');
+        }
+        if (refreshToken !== staleRefreshToken) {
+            return;
+        }
+        const { data } = await axios.post(`${api.defaults.baseURL}/auth/refresh`, { refresh_token: refreshToken });
+        localStorage.setItem('token', data.access_token);
+        localStorage.setItem('refreshToken', data.refresh_token);
+    };
+    return navigator.locks ? navigator.locks.request('lokai-token-refresh', refresh) : refresh();
+};
+
+// Access tokens are short-lived: on a 401, get new tokens once and retry.
+// Parallel requests of this tab share the same refresh.
+let refreshing = null;
+
+api.interceptors.response.use(
+    (response) => response,
+    async (error) => {
+        const original = error.config;
+        const refreshToken = localStorage.getItem('refreshToken');
+        if (error.response?.status !== 401 || !refreshToken || original._retried || original.url.startsWith('/auth/')) {
+            return Promise.reject(error);
+        }
+        original._retried = true;
+
+        try {
+            if (!refreshing) {
+                refreshing = refreshTokens(refreshToken).finally(() => { refreshing = null; });
+            }
+            await refreshing;
+        } catch (refreshError) {
+            localStorage.removeItem('token');
+            localStorage.removeItem('refreshToken');
+            // The session is over (expired, logged out elsewhere or password reset)
+            window.location.href = '/login';
+            return Promise.reject(error);
+        }
+        return api(original);
+    }
+);
+
 export default api;
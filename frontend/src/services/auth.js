@@ -10,6 +10,11 @@ export const login = async (email, password) => {
     return response.data;
 };
 
+export const logout = async (refreshToken) => {
+    const response = await api.post('/auth/logout', { refresh_token: refreshToken });
+    return response.data;
+};
+
 export const register = async (userData) => {
     const response = await api.post('/auth/register', userData);
     return response.data;
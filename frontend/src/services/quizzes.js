@@ -14,3 +14,8 @@ export const getQuizzes = async () => {
     const response = await api.get('/quizzes/');
     return response.data;
 };
+
+export const shareQuiz = async (quizId, shared) => {
+    const response = await api.put(`/quizzes/${quizId}/sharing`, { shared });
+    return response.data;
+};